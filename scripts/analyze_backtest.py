@@ -19,6 +19,8 @@ Usage:
 
 import sys
 import pandas as pd
+import matplotlib
+matplotlib.use('Agg')  # Charts are only written to PDF; skip GUI backend startup
 import matplotlib.pyplot as plt
 import seaborn as sns
 import numpy as np
@@ -45,6 +47,13 @@ class BacktestAnalyzer:
         self.settled_df = None
         self.load_data()
         
+    @staticmethod
+    def _roi_by(df, column):
+        """ROI% per group of `column` from vectorized sums (0 where nothing was staked)."""
+        sums = df.groupby(column, observed=True)[['actual_profit_loss', 'recommended_stake']].sum()
+        staked = sums['recommended_stake']
+        return (sums['actual_profit_loss'] / staked * 100).where(staked > 0, 0)
+    
     def load_data(self):
         """Load and preprocess the backtest data."""
         print(f"\n{'='*80}")
@@ -58,6 +67,8 @@ class BacktestAnalyzer:
             self.df['date_placed'] = pd.to_datetime(self.df['date_placed'], format='ISO8601')
         if 'commence_time' in self.df.columns:
             self.df['commence_time'] = pd.to_datetime(self.df['commence_time'], format='mixed', utc=True)
+        if 'timestamp' in self.df.columns:
+            self.df['timestamp'] = pd.to_datetime(self.df['timestamp'], format='ISO8601', utc=True, errors='coerce')
             
         # Filter to settled bets only for most analyses
         self.settled_df = self.df[self.df['bet_result'].isin(['win', 'loss'])].copy()
@@ -435,15 +446,19 @@ class BacktestAnalyzer:
         # Create PDF file
         pdf_filename = output_dir / 'backtest_analysis_report.pdf'
         
+        # Chronological view with the running bankroll, shared by the
+        # time-series charts below
+        df_sorted = df.sort_values('date_placed')
+        # Get initial bankroll from first row (all rows have same value)
+        initial_bankroll = df_sorted['bankroll'].iloc[0]
+        df_sorted['cumulative_profit'] = df_sorted['actual_profit_loss'].cumsum()
+        df_sorted['actual_bankroll'] = initial_bankroll + df_sorted['cumulative_profit']
+        df_sorted['bet_number'] = range(1, len(df_sorted) + 1)
+        
         with PdfPages(pdf_filename) as pdf:
             # 1. Bankroll Progression Over Time
             print("✓ Generating: Bankroll Progression Over Time")
             fig, ax = plt.subplots(figsize=(14, 8))
-            df_sorted = df.sort_values('date_placed')
-            # Get initial bankroll from first row (all rows have same value)
-            initial_bankroll = df_sorted['bankroll'].iloc[0]
-            df_sorted['cumulative_profit'] = df_sorted['actual_profit_loss'].cumsum()
-            df_sorted['actual_bankroll'] = initial_bankroll + df_sorted['cumulative_profit']
             ax.plot(df_sorted['date_placed'], df_sorted['actual_bankroll'], linewidth=2.5, color='steelblue')
             ax.axhline(y=initial_bankroll, color='gray', linestyle='--', alpha=0.5, linewidth=2, label='Initial Bankroll')
             ax.fill_between(df_sorted['date_placed'], df_sorted['actual_bankroll'], initial_bankroll, 
@@ -455,19 +470,14 @@ class BacktestAnalyzer:
             ax.set_ylabel('Bankroll ($)', fontsize=12)
             ax.grid(True, alpha=0.3)
             ax.legend(loc='best')
-            plt.xticks(rotation=45)
-            plt.tight_layout()
+            ax.tick_params(axis='x', labelrotation=45)
+            fig.tight_layout()
             pdf.savefig(fig, dpi=300, bbox_inches='tight')
-            plt.close()
+            plt.close(fig)
             
             # 2. Bankroll Progression by Bet Number
             print("✓ Generating: Bankroll Progression by Bet Number")
             fig, ax = plt.subplots(figsize=(14, 8))
-            df_sorted = df.sort_values('date_placed')
-            initial_bankroll = df_sorted['bankroll'].iloc[0]
-            df_sorted['cumulative_profit'] = df_sorted['actual_profit_loss'].cumsum()
-            df_sorted['actual_bankroll'] = initial_bankroll + df_sorted['cumulative_profit']
-            df_sorted['bet_number'] = range(1, len(df_sorted) + 1)
             ax.plot(df_sorted['bet_number'], df_sorted['actual_bankroll'], linewidth=2.5, color='steelblue')
             ax.axhline(y=initial_bankroll, color='gray', linestyle='--', alpha=0.5, linewidth=2, label='Initial Bankroll')
             ax.fill_between(df_sorted['bet_number'], df_sorted['actual_bankroll'], initial_bankroll, 
@@ -479,17 +489,13 @@ class BacktestAnalyzer:
             ax.set_ylabel('Bankroll ($)', fontsize=12)
             ax.grid(True, alpha=0.3)
             ax.legend(loc='best')
-            plt.tight_layout()
+            fig.tight_layout()
             pdf.savefig(fig, dpi=300, bbox_inches='tight')
-            plt.close()
+            plt.close(fig)
             
             # 3. Drawdown Percentage Over Time
             print("✓ Generating: Drawdown Percentage Over Time")
             fig, ax = plt.subplots(figsize=(14, 8))
-            df_sorted = df.sort_values('date_placed')
-            initial_bankroll = df_sorted['bankroll'].iloc[0]
-            df_sorted['cumulative_profit'] = df_sorted['actual_profit_loss'].cumsum()
-            df_sorted['actual_bankroll'] = initial_bankroll + df_sorted['cumulative_profit']
             
             # Calculate running maximum (peak) and drawdown
             df_sorted['running_max'] = df_sorted['actual_bankroll'].cummax()
@@ -515,10 +521,10 @@ class BacktestAnalyzer:
             ax.set_ylabel('Drawdown (%)', fontsize=12)
             ax.grid(True, alpha=0.3)
             ax.legend(loc='best')
-            plt.xticks(rotation=45)
-            plt.tight_layout()
+            ax.tick_params(axis='x', labelrotation=45)
+            fig.tight_layout()
             pdf.savefig(fig, dpi=300, bbox_inches='tight')
-            plt.close()
+            plt.close(fig)
             
             # 4. ROI by EV Range
             print("✓ Generating: ROI by EV Range")
@@ -526,9 +532,7 @@ class BacktestAnalyzer:
             labels = ['0-5%', '5-10%', '10-15%', '15-20%', '20-25%', '25-30%', '30%+']
             df['ev_range'] = pd.cut(df['ev_percentage'], bins=bins, labels=labels, include_lowest=True)
             
-            ev_roi = df.groupby('ev_range', observed=True).apply(
-                lambda x: (x['actual_profit_loss'].sum() / x['recommended_stake'].sum() * 100) if x['recommended_stake'].sum() > 0 else 0
-            ).round(2)
+            ev_roi = self._roi_by(df, 'ev_range').round(2)
             
             fig, ax = plt.subplots(figsize=(14, 8))
             colors = ['green' if x > 0 else 'red' for x in ev_roi.values]
@@ -541,9 +545,9 @@ class BacktestAnalyzer:
             # Add value labels on bars
             for i, v in enumerate(ev_roi.values):
                 ax.text(i, v + (3 if v > 0 else -3), f'{v:.1f}%', ha='center', va='bottom' if v > 0 else 'top', fontweight='bold')
-            plt.tight_layout()
+            fig.tight_layout()
             pdf.savefig(fig, dpi=300, bbox_inches='tight')
-            plt.close()
+            plt.close(fig)
             
             # 4. Profit by Sport (Top 20)
             print("✓ Generating: Profit by Sport")
@@ -556,9 +560,9 @@ class BacktestAnalyzer:
             ax.set_title('Top 20 Sports by Profit/Loss', fontsize=16, fontweight='bold', pad=20)
             ax.set_xlabel('Profit/Loss ($)', fontsize=12)
             ax.set_ylabel('Sport', fontsize=12)
-            plt.tight_layout()
+            fig.tight_layout()
             pdf.savefig(fig, dpi=300, bbox_inches='tight')
-            plt.close()
+            plt.close(fig)
             
             # 5. Profit by Bookmaker
             print("✓ Generating: Profit by Bookmaker")
@@ -572,15 +576,13 @@ class BacktestAnalyzer:
             ax.set_xlabel('Bookmaker', fontsize=12)
             ax.set_ylabel('Profit/Loss ($)', fontsize=12)
             ax.set_xticklabels(ax.get_xticklabels(), rotation=45, ha='right')
-            plt.tight_layout()
+            fig.tight_layout()
             pdf.savefig(fig, dpi=300, bbox_inches='tight')
-            plt.close()
+            plt.close(fig)
             
             # 6. ROI by Market Type
             print("✓ Generating: ROI by Market Type")
-            market_roi = df.groupby('market').apply(
-                lambda x: (x['actual_profit_loss'].sum() / x['recommended_stake'].sum() * 100) if x['recommended_stake'].sum() > 0 else 0
-            ).sort_values(ascending=False).round(2)
+            market_roi = self._roi_by(df, 'market').sort_values(ascending=False).round(2)
             
             fig, ax = plt.subplots(figsize=(14, 8))
             colors = ['green' if x > 0 else 'red' for x in market_roi.values]
@@ -593,9 +595,9 @@ class BacktestAnalyzer:
             # Add value labels
             for i, v in enumerate(market_roi.values):
                 ax.text(i, v + (2 if v > 0 else -2), f'{v:.1f}%', ha='center', va='bottom' if v > 0 else 'top', fontweight='bold')
-            plt.tight_layout()
+            fig.tight_layout()
             pdf.savefig(fig, dpi=300, bbox_inches='tight')
-            plt.close()
+            plt.close(fig)
             
             # 7. Win Rate by Odds Range
             print("✓ Generating: Win Rate by Odds Range")
@@ -603,9 +605,7 @@ class BacktestAnalyzer:
             labels = ['1.0-2.0', '2.0-3.0', '3.0-5.0', '5.0-7.0', '7.0-10.0', '10.0+']
             df['odds_range'] = pd.cut(df['bet_odds'], bins=bins, labels=labels, include_lowest=True)
             
-            odds_winrate = df.groupby('odds_range', observed=True).apply(
-                lambda x: (x['bet_result'] == 'win').sum() / len(x) * 100
-            ).round(2)
+            odds_winrate = df['bet_result'].eq('win').groupby(df['odds_range'], observed=True).mean().mul(100).round(2)
             
             fig, ax = plt.subplots(figsize=(14, 8))
             odds_winrate.plot(kind='bar', ax=ax, color='coral', edgecolor='black', linewidth=1.5)
@@ -616,9 +616,9 @@ class BacktestAnalyzer:
             # Add value labels
             for i, v in enumerate(odds_winrate.values):
                 ax.text(i, v + 1, f'{v:.1f}%', ha='center', va='bottom', fontweight='bold')
-            plt.tight_layout()
+            fig.tight_layout()
             pdf.savefig(fig, dpi=300, bbox_inches='tight')
-            plt.close()
+            plt.close(fig)
             
             # 8. EV Distribution
             print("✓ Generating: EV Distribution")
@@ -632,9 +632,9 @@ class BacktestAnalyzer:
             ax.set_xlabel('EV Percentage', fontsize=12)
             ax.set_ylabel('Frequency', fontsize=12)
             ax.legend(fontsize=11)
-            plt.tight_layout()
+            fig.tight_layout()
             pdf.savefig(fig, dpi=300, bbox_inches='tight')
-            plt.close()
+            plt.close(fig)
             
             # 9. Actual vs Expected Profit by Month
             print("✓ Generating: Expected vs Actual Monthly")
@@ -658,9 +658,9 @@ class BacktestAnalyzer:
             ax.set_xticklabels([str(m) for m in monthly_comparison.index], rotation=45, ha='right')
             ax.legend(fontsize=11)
             ax.axhline(y=0, color='black', linestyle='-', linewidth=0.5)
-            plt.tight_layout()
+            fig.tight_layout()
             pdf.savefig(fig, dpi=300, bbox_inches='tight')
-            plt.close()
+            plt.close(fig)
             
             # 10. Bet Volume by Day of Week
             print("✓ Generating: Bet Volume by Day of Week")
@@ -679,9 +679,9 @@ class BacktestAnalyzer:
             # Add value labels on bars
             for i, v in enumerate(dow_volume.values):
                 ax.text(i, v + max(dow_volume.values)*0.01, str(v), ha='center', va='bottom', fontweight='bold')
-            plt.tight_layout()
+            fig.tight_layout()
             pdf.savefig(fig, dpi=300, bbox_inches='tight')
-            plt.close()
+            plt.close(fig)
             
             # 11. Bet Volume by Day of Month
             print("✓ Generating: Bet Volume by Day of Month")
@@ -695,9 +695,9 @@ class BacktestAnalyzer:
             ax.set_xlabel('Day of Month', fontsize=12)
             ax.set_ylabel('Number of Bets', fontsize=12)
             ax.set_xticklabels(ax.get_xticklabels(), rotation=0)
-            plt.tight_layout()
+            fig.tight_layout()
             pdf.savefig(fig, dpi=300, bbox_inches='tight')
-            plt.close()
+            plt.close(fig)
             
             # 12. Bet Volume by Month of Year
             print("✓ Generating: Bet Volume by Month of Year")
@@ -718,16 +718,15 @@ class BacktestAnalyzer:
             for i, v in enumerate(month_volume.values):
                 if v > 0:  # Only show label if there are bets
                     ax.text(i, v + max(month_volume.values)*0.01, str(v), ha='center', va='bottom', fontweight='bold')
-            plt.tight_layout()
+            fig.tight_layout()
             pdf.savefig(fig, dpi=300, bbox_inches='tight')
-            plt.close()
+            plt.close(fig)
             
             # 13. Bet Volume by Hour of Day
             print("✓ Generating: Bet Volume by Hour of Day")
             # Use timestamp instead of date_placed to get the hour
             if 'timestamp' in df.columns:
-                df['timestamp_dt'] = pd.to_datetime(df['timestamp'])
-                df['hour'] = df['timestamp_dt'].dt.hour
+                df['hour'] = df['timestamp'].dt.hour
             else:
                 df['hour'] = df['date_placed'].dt.hour
             
@@ -739,9 +738,9 @@ class BacktestAnalyzer:
             ax.set_xlabel('Hour of Day', fontsize=12)
             ax.set_ylabel('Number of Bets', fontsize=12)
             ax.set_xticklabels([f'{int(h):02d}:00' for h in hour_volume.index], rotation=45, ha='right')
-            plt.tight_layout()
+            fig.tight_layout()
             pdf.savefig(fig, dpi=300, bbox_inches='tight')
-            plt.close()
+            plt.close(fig)
             
             # 14. Heatmap: Sport vs Market Performance (Top 15 sports)
             print("✓ Generating: Sport vs Market Heatmap")
@@ -762,9 +761,9 @@ class BacktestAnalyzer:
             ax.set_title('Profit/Loss Heatmap: Top 15 Sports vs Market', fontsize=16, fontweight='bold', pad=20)
             ax.set_xlabel('Market', fontsize=12)
             ax.set_ylabel('Sport', fontsize=12)
-            plt.tight_layout()
+            fig.tight_layout()
             pdf.savefig(fig, dpi=300, bbox_inches='tight')
-            plt.close()
+            plt.close(fig)
             
             # 11. Combined Dashboard - Key Metrics
             print("✓ Generating: Performance Dashboard")
@@ -799,9 +798,7 @@ class BacktestAnalyzer:
             bins = [0, 20, 30, 40, 50, 100, 1000]
             labels = ['0-20', '20-30', '30-40', '40-50', '50-100', '100+']
             df['stake_range'] = pd.cut(df['recommended_stake'], bins=bins, labels=labels, include_lowest=True)
-            stake_roi = df.groupby('stake_range', observed=True).apply(
-                lambda x: (x['actual_profit_loss'].sum() / x['recommended_stake'].sum() * 100) if x['recommended_stake'].sum() > 0 else 0
-            )
+            stake_roi = self._roi_by(df, 'stake_range')
             
             ax3 = fig.add_subplot(gs[0, 2])
             colors = ['green' if x > 0 else 'red' for x in stake_roi.values]
@@ -877,7 +874,7 @@ class BacktestAnalyzer:
             
             fig.suptitle('Backtest Performance Dashboard', fontsize=18, fontweight='bold', y=0.98)
             pdf.savefig(fig, dpi=300, bbox_inches='tight')
-            plt.close()
+            plt.close(fig)
             
             # 11. ROI vs EV Scatter Plot - Validate model accuracy
             print("✓ Generating: ROI vs EV Validation")
@@ -918,18 +915,14 @@ class BacktestAnalyzer:
             plt.colorbar(scatter, ax=ax, label='ROI (%)')
             ax.text(0.02, 0.98, 'Bubble size = # of bets', transform=ax.transAxes, 
                    fontsize=10, verticalalignment='top', bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5))
-            plt.tight_layout()
+            fig.tight_layout()
             pdf.savefig(fig, dpi=300, bbox_inches='tight')
-            plt.close()
+            plt.close(fig)
             
             # 12. Drawdown Analysis
             print("✓ Generating: Drawdown Analysis")
             fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(14, 10))
             
-            df_sorted = df.sort_values('date_placed')
-            initial_bankroll = df_sorted['bankroll'].iloc[0]
-            df_sorted['cumulative'] = df_sorted['actual_profit_loss'].cumsum()
-            df_sorted['actual_bankroll'] = initial_bankroll + df_sorted['cumulative']
             df_sorted['running_max'] = df_sorted['actual_bankroll'].cummax()
             df_sorted['drawdown'] = df_sorted['actual_bankroll'] - df_sorted['running_max']
             df_sorted['drawdown_pct'] = (df_sorted['drawdown'] / df_sorted['running_max']) * 100
@@ -958,15 +951,14 @@ class BacktestAnalyzer:
             ax2.set_ylabel('Drawdown ($)', fontsize=12)
             ax2.grid(True, alpha=0.3)
             
-            plt.tight_layout()
+            fig.tight_layout()
             pdf.savefig(fig, dpi=300, bbox_inches='tight')
-            plt.close()
+            plt.close(fig)
             
             # 13. Win/Loss Streaks Analysis
             print("✓ Generating: Win/Loss Streaks")
             fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
             
-            df_sorted = df.sort_values('date_placed')
             df_sorted['win'] = (df_sorted['bet_result'] == 'win').astype(int)
             df_sorted['streak'] = df_sorted['win'].groupby((df_sorted['win'] != df_sorted['win'].shift()).cumsum()).cumsum()
             df_sorted['loss_streak'] = (1 - df_sorted['win']).groupby(((1 - df_sorted['win']) != (1 - df_sorted['win']).shift()).cumsum()).cumsum()
@@ -999,9 +991,9 @@ class BacktestAnalyzer:
             ax2.legend()
             ax2.grid(True, alpha=0.3)
             
-            plt.tight_layout()
+            fig.tight_layout()
             pdf.savefig(fig, dpi=300, bbox_inches='tight')
-            plt.close()
+            plt.close(fig)
             
             # 14. Bookmaker ROI Comparison (Detailed)
             print("✓ Generating: Bookmaker Deep Dive")
@@ -1045,9 +1037,9 @@ class BacktestAnalyzer:
             ax4.set_title('Top 10 Bookmakers by Bet Volume', fontweight='bold')
             ax4.set_xlabel('Number of Bets')
             
-            plt.tight_layout()
+            fig.tight_layout()
             pdf.savefig(fig, dpi=300, bbox_inches='tight')
-            plt.close()
+            plt.close(fig)
             
             # 15. Profit Distribution
             print("✓ Generating: Profit Distribution Analysis")
@@ -1087,27 +1079,22 @@ class BacktestAnalyzer:
             ax3.set_xlabel('EV Range')
             ax3.set_ylabel('Profit/Loss ($)')
             ax3.axhline(y=0, color='red', linestyle='--', linewidth=1, alpha=0.5)
-            plt.sca(ax3)
-            plt.xticks(rotation=45)
+            ax3.tick_params(axis='x', labelrotation=45)
             
             # Cumulative profit by bet number
-            df_sorted = df.sort_values('date_placed')
-            df_sorted['bet_number'] = range(1, len(df_sorted) + 1)
-            df_sorted['cumulative'] = df_sorted['actual_profit_loss'].cumsum()
-            
-            ax4.plot(df_sorted['bet_number'], df_sorted['cumulative'], linewidth=2, color='blue')
-            ax4.fill_between(df_sorted['bet_number'], df_sorted['cumulative'], 0, 
-                           where=(df_sorted['cumulative'] >= 0), alpha=0.3, color='green')
-            ax4.fill_between(df_sorted['bet_number'], df_sorted['cumulative'], 0, 
-                           where=(df_sorted['cumulative'] < 0), alpha=0.3, color='red')
+            ax4.plot(df_sorted['bet_number'], df_sorted['cumulative_profit'], linewidth=2, color='blue')
+            ax4.fill_between(df_sorted['bet_number'], df_sorted['cumulative_profit'], 0, 
+                           where=(df_sorted['cumulative_profit'] >= 0), alpha=0.3, color='green')
+            ax4.fill_between(df_sorted['bet_number'], df_sorted['cumulative_profit'], 0, 
+                           where=(df_sorted['cumulative_profit'] < 0), alpha=0.3, color='red')
             ax4.set_title('Cumulative Profit by Bet Number', fontweight='bold')
             ax4.set_xlabel('Bet Number')
             ax4.set_ylabel('Cumulative Profit ($)')
             ax4.grid(True, alpha=0.3)
             
-            plt.tight_layout()
+            fig.tight_layout()
             pdf.savefig(fig, dpi=300, bbox_inches='tight')
-            plt.close()
+            plt.close(fig)
             
             # 16. Time-Based Patterns Deep Dive
             print("✓ Generating: Time Pattern Analysis")
@@ -1117,7 +1104,7 @@ class BacktestAnalyzer:
             # Hour of day (if timestamp available)
             if 'timestamp' in df.columns:
                 try:
-                    df['hour'] = pd.to_datetime(df['timestamp']).dt.hour
+                    df['hour'] = df['timestamp'].dt.hour
                     hourly_profit = df.groupby('hour')['actual_profit_loss'].sum()
                     ax1 = fig.add_subplot(gs[0, 0])
                     colors = ['green' if x > 0 else 'red' for x in hourly_profit.values]
@@ -1137,7 +1124,6 @@ class BacktestAnalyzer:
             
             # Rolling 30-bet average
             ax2 = fig.add_subplot(gs[0, 1])
-            df_sorted = df.sort_values('date_placed')
             df_sorted['rolling_roi'] = (df_sorted['actual_profit_loss'].rolling(30).sum() / 
                                        df_sorted['recommended_stake'].rolling(30).sum() * 100)
             ax2.plot(df_sorted['date_placed'], df_sorted['rolling_roi'], linewidth=2, color='purple')
@@ -1198,9 +1184,9 @@ class BacktestAnalyzer:
             ax5.axhline(y=0, color='black', linestyle='-', linewidth=0.5)
             ax5.tick_params(axis='x', rotation=45)
             
-            plt.tight_layout()
+            fig.tight_layout()
             pdf.savefig(fig, dpi=300, bbox_inches='tight')
-            plt.close()
+            plt.close(fig)
             
             # 23. ROI by Time-to-Commence (Hourly)
             print("✓ Generating: ROI by Time-to-Commence (Hourly)")
@@ -1242,17 +1228,16 @@ class BacktestAnalyzer:
             ax1.set_ylabel('ROI (%)', fontsize=12)
             ax1.grid(True, alpha=0.3)
             
-            # Add trend line if scipy is available
-            try:
-                from scipy import stats
-                if len(hourly_data) > 1:
-                    slope, intercept, r_value, p_value, std_err = stats.linregress(hourly_data.index, hourly_data['roi'])
-                    trend_line = slope * hourly_data.index + intercept
-                    ax1.plot(hourly_data.index, trend_line, 'r--', linewidth=2, alpha=0.7, 
-                            label=f'Trend (R²={r_value**2:.3f})')
-                    ax1.legend()
-            except ImportError:
-                pass
+            # Add least-squares trend line
+            if len(hourly_data) > 1:
+                hours = hourly_data.index.to_numpy(dtype=float)
+                roi_values = hourly_data['roi'].to_numpy(dtype=float)
+                slope, intercept = np.polyfit(hours, roi_values, 1)
+                r_value = np.corrcoef(hours, roi_values)[0, 1]
+                trend_line = slope * hours + intercept
+                ax1.plot(hours, trend_line, 'r--', linewidth=2, alpha=0.7, 
+                        label=f'Trend (R²={r_value**2:.3f})')
+                ax1.legend()
             
             # Bet count bar chart
             ax2.bar(hourly_data.index, hourly_data['count'], color='steelblue', edgecolor='black', linewidth=1, alpha=0.7)
@@ -1277,9 +1262,9 @@ class BacktestAnalyzer:
             ax3.grid(True, alpha=0.3)
             ax3.legend()
             
-            plt.tight_layout()
+            fig.tight_layout()
             pdf.savefig(fig, dpi=300, bbox_inches='tight')
-            plt.close()
+            plt.close(fig)
             
             # Add metadata to PDF
             d = pdf.infodict()
@@ -1336,23 +1321,17 @@ class BacktestAnalyzer:
         print("-" * 80)
         
         # Best sport
-        sport_roi = df.groupby('sport').apply(
-            lambda x: (x['actual_profit_loss'].sum() / x['recommended_stake'].sum() * 100) if x['recommended_stake'].sum() > 0 else 0
-        ).sort_values(ascending=False)
+        sport_roi = self._roi_by(df, 'sport').sort_values(ascending=False)
         if len(sport_roi) > 0:
             print(f"✓ Best Sport (ROI): {sport_roi.index[0]} ({sport_roi.iloc[0]:.2f}%)")
         
         # Best bookmaker
-        book_roi = df.groupby('bookmaker').apply(
-            lambda x: (x['actual_profit_loss'].sum() / x['recommended_stake'].sum() * 100) if x['recommended_stake'].sum() > 0 else 0
-        ).sort_values(ascending=False)
+        book_roi = self._roi_by(df, 'bookmaker').sort_values(ascending=False)
         if len(book_roi) > 0:
             print(f"✓ Best Bookmaker (ROI): {book_roi.index[0]} ({book_roi.iloc[0]:.2f}%)")
         
         # Best market
-        market_roi = df.groupby('market').apply(
-            lambda x: (x['actual_profit_loss'].sum() / x['recommended_stake'].sum() * 100) if x['recommended_stake'].sum() > 0 else 0
-        ).sort_values(ascending=False)
+        market_roi = self._roi_by(df, 'market').sort_values(ascending=False)
         if len(market_roi) > 0:
             print(f"✓ Best Market (ROI): {market_roi.index[0]} ({market_roi.iloc[0]:.2f}%)")
         
@@ -1361,9 +1340,7 @@ class BacktestAnalyzer:
         labels = ['0-5%', '5-10%', '10-15%', '15-20%', '20-25%', '25-30%', '30%+']
         df['ev_range'] = pd.cut(df['ev_percentage'], bins=bins, labels=labels, include_lowest=True)
         
-        ev_roi = df.groupby('ev_range', observed=True).apply(
-            lambda x: (x['actual_profit_loss'].sum() / x['recommended_stake'].sum() * 100) if x['recommended_stake'].sum() > 0 else 0
-        ).sort_values(ascending=False)
+        ev_roi = self._roi_by(df, 'ev_range').sort_values(ascending=False)
         if len(ev_roi) > 0:
             print(f"✓ Best EV Range (ROI): {ev_roi.index[0]} ({ev_roi.iloc[0]:.2f}%)")
         
@@ -4,7 +4,14 @@ Browser automation modules.
 This package contains browser automation and action logging functionality.
 """
 
-from .browser_automation import BrowserAutomation
-from .action_logger import ActionLogger
+# Lazy imports so importing one submodule doesn't load the others
+def __getattr__(name):
+    if name == 'BrowserAutomation':
+        from .browser_automation import BrowserAutomation
+        return BrowserAutomation
+    elif name == 'ActionLogger':
+        from .action_logger import ActionLogger
+        return ActionLogger
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 __all__ = ['BrowserAutomation', 'ActionLogger']
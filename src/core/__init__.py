@@ -5,7 +5,14 @@ This package contains the core functionality for positive EV scanning
 and Kelly Criterion bet sizing.
 """
 
-from .positive_ev_scanner import PositiveEVScanner
-from .kelly_criterion import KellyCriterion
+# Lazy imports so importing one submodule doesn't load the others
+def __getattr__(name):
+    if name == 'PositiveEVScanner':
+        from .positive_ev_scanner import PositiveEVScanner
+        return PositiveEVScanner
+    elif name == 'KellyCriterion':
+        from .kelly_criterion import KellyCriterion
+        return KellyCriterion
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 __all__ = ['PositiveEVScanner', 'KellyCriterion']
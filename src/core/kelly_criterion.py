@@ -48,6 +48,30 @@ class KellyCriterion:
             return value
         return round(value / nearest) * nearest
     
+    @staticmethod
+    def full_kelly_fraction(decimal_odds: float, true_probability: float) -> float:
+        """
+        Full Kelly fraction of bankroll to bet (before any Kelly fraction).
+        
+        Args:
+            decimal_odds: The odds being offered (decimal format)
+            true_probability: Estimated true probability of outcome (0 to 1)
+            
+        Returns:
+            Fraction of bankroll (0.0 if the odds offer no profit)
+        """
+        # Kelly formula: f* = (bp - q) / b
+        # Where b = decimal_odds - 1
+        b = decimal_odds - 1
+        
+        # Guard against invalid odds (odds must be > 1.0)
+        if b <= 0:
+            return 0.0
+        
+        p = true_probability
+        q = 1 - p
+        return ((b * p) - q) / b
+    
     def calculate_kelly_stake(
         self, 
         decimal_odds: float, 
@@ -68,15 +92,9 @@ class KellyCriterion:
                 - recommended_stake: Actual stake amount
                 - bankroll: Total bankroll
         """
-        # Kelly formula: f* = (bp - q) / b
-        # Where b = decimal_odds - 1
-        b = decimal_odds - 1
-        p = true_probability
-        q = 1 - p
-        
         # Guard against invalid odds (odds must be > 1.0)
         # If odds are 1.0 or less, there's no profit potential
-        if b <= 0:
+        if decimal_odds <= 1:
             return {
                 'kelly_percentage': 0.0,
                 'recommended_stake': 0.0,
@@ -84,7 +102,7 @@ class KellyCriterion:
             }
         
         # Calculate Kelly percentage
-        kelly_percentage = ((b * p) - q) / b
+        kelly_percentage = self.full_kelly_fraction(decimal_odds, true_probability)
         
         # Apply Kelly fraction (e.g., 0.5 for half Kelly)
         kelly_percentage *= kelly_fraction
@@ -5,21 +5,28 @@ Uses The Odds API to find positive expected value betting opportunities
 by comparing odds across multiple sportsbooks against sharp bookmakers.
 """
 
+import heapq
+import sys
 import requests
+from requests.adapters import HTTPAdapter
 from typing import Dict, List, Optional, Tuple, Set
 from datetime import datetime, timedelta
 import time
 import os
+import random
 import pickle
 from pathlib import Path
 from dotenv import load_dotenv
 from functools import lru_cache
+from operator import itemgetter
+from collections import Counter
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import threading
 from src.core.kelly_criterion import KellyCriterion
 from src.utils.bet_logger import BetLogger
 from src.utils.bet_repository import BetRepository
 from src.utils.error_logger import logger
+from src.utils.rate_limiter import RateLimiter, AdaptiveConcurrencyLimiter
 from src.utils.odds_utils import (
     decimal_to_fractional, 
     calculate_implied_probability, 
@@ -36,6 +43,48 @@ from src.utils.config import BookmakerCredentials
 # Load environment variables from .env file
 load_dotenv()
 
+# Per-opportunity block written by print_opportunities
+_OPP_TEMPLATE = (
+    "{i}. 🎯 {game}\n"
+    "   📅 {commence_time}\n"
+    "   🎲 Market: {market}\n"
+    "   🏆 Bet: {outcome}\n"
+    "   💰 Bookmaker: {bookmaker}\n"
+    "   📈 Odds: {odds:.2f} ({frac_odds}) | Sharp: {sharp_odds:.2f} ({frac_sharp})\n"
+    "   ✅ Expected Value: +{ev:.2f}%\n"
+    "   🎲 True Probability: {true_probability:.1f}% | Bookmaker: {bookmaker_probability:.1f}%\n"
+    "   \n"
+    "   💵 RECOMMENDED BET SIZE {kelly_fraction_display}:\n"
+    "      Stake: £{stake:.2f}\n"
+    "      Kelly %: {kelly_percentage:.2f}% of bankroll\n"
+    "      Expected Profit: £{expected_profit:.2f}\n"
+    "   \n"
+    "   ➤ PLACE BET HERE: {bookmaker_url}\n"
+)
+
+
+def _kelly_key(opportunity: Dict) -> float:
+    """Sort key for the nested Kelly percentage."""
+    return opportunity['kelly_stake']['kelly_percentage']
+
+
+# Sort key and display label for each ORDER_BY setting
+_SORT_KEY_MAP = {
+    'ev': itemgetter('ev_percentage'),
+    'kelly': _kelly_key,
+    'expected_profit': itemgetter('expected_profit'),
+    'odds': itemgetter('odds'),
+    'match_time': itemgetter('commence_time')
+}
+
+_SORT_LABELS = {
+    'ev': 'Expected Value %',
+    'kelly': 'Kelly %',
+    'expected_profit': 'Expected Profit',
+    'odds': 'Odds',
+    'match_time': 'Match Time'
+}
+
 
 class PositiveEVScanner:
     """
@@ -113,6 +162,10 @@ class PositiveEVScanner:
         # Markets - read from env or use default
         self.markets = os.getenv('MARKETS', 'h2h,spreads,totals')
         
+        # Sports scanned by scan_all_sports when none are given - read from env or use defaults
+        betting_sports_str = os.getenv('BETTING_SPORTS', 'soccer_epl,soccer_england_championship,soccer_spain_la_liga,soccer_germany_bundesliga,soccer_italy_serie_a,soccer_france_ligue_one,soccer_uefa_champs_league,soccer_uefa_europa_league')
+        self._default_sport_keys = tuple(sport.strip() for sport in betting_sports_str.split(','))
+        
         # Odds format - hardcoded to decimal for EV calculations
         self.odds_format = 'decimal'
         
@@ -148,14 +201,43 @@ class PositiveEVScanner:
         self.max_concurrent_event_requests = 3  # Lower limit for event endpoint
         
         # Rate limiting for API requests
-        self._last_request_time = 0
+        # Optional ODDS_API_RPM caps requests per sliding minute (0 = no cap)
         self._min_request_interval = 0.15  # 150ms between requests (≈6.6 req/sec)
-        self._request_lock = threading.Lock()
+        self._rate_limiter = RateLimiter(
+            min_interval=self._min_request_interval,
+            max_per_minute=int(os.getenv('ODDS_API_RPM', '0'))
+        )
+        
+        # Retry backoff bounds for transient API failures (seconds)
+        self._retry_min_backoff = 1.0
+        self._retry_max_backoff = 16.0
+        
+        # Adaptive concurrency for odds requests (AIMD)
+        # Grows towards 2x max_concurrent_requests while latency stays under
+        # ODDS_API_TARGET_LATENCY seconds, halves on 429s/5xx/timeouts
+        self._concurrency = AdaptiveConcurrencyLimiter(
+            initial_limit=self.max_concurrent_requests,
+            max_limit=self.max_concurrent_requests * 2,
+            target_latency=float(os.getenv('ODDS_API_TARGET_LATENCY', '2.0'))
+        )
+        
+        # Shared HTTP session so requests reuse pooled keep-alive connections
+        # instead of paying a TLS handshake each time. Retries are handled by
+        # _fetch_odds/get_events, so urllib3's own retries are disabled
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.max_concurrent_requests,
+                              pool_maxsize=self.max_concurrent_requests * 2,
+                              max_retries=0)
+        self._session.mount('https://', adapter)
+        self._session.mount('http://', adapter)
         
         # Sorting configuration - read from env or use defaults
         self.order_by = os.getenv('ORDER_BY', 'expected_profit').lower()
         self.sort_order = os.getenv('SORT_ORDER', 'desc').lower()
         
+        # Only display the best N opportunities per sport (0 = show all)
+        self.display_top_n = int(os.getenv('DISPLAY_TOP_N', '0'))
+        
         # Filtering configuration - read from env or use defaults
         # New outcome-based filtering (backwards compatible with old game-based)
         self.one_bet_per_outcome = os.getenv('ONE_BET_PER_OUTCOME', os.getenv('ONE_BET_PER_GAME', 'false')).lower() == 'true'
@@ -170,6 +252,19 @@ class PositiveEVScanner:
         self.use_vig_adjusted_ev = os.getenv('USE_VIG_ADJUSTED_EV', 'false').lower() == 'true'
         self.vig_removal_method = os.getenv('VIG_REMOVAL_METHOD', 'proportional').lower()
         
+        # Output buffering for print_opportunities - one write at the end by
+        # default, or flush every N chunks. SCANNER_LIVE_OUTPUT=true writes
+        # straight through when stdout is a terminal
+        self._print_buffer_size = int(os.getenv('SCANNER_PRINT_BUFFER', '0'))
+        self._live_output = os.getenv('SCANNER_LIVE_OUTPUT', 'false').lower() == 'true'
+        # SCANNER_FAST_STDOUT=true writes batches straight to the stdout file
+        # descriptor (one syscall each) when output is piped or redirected
+        self._fast_stdout = os.getenv('SCANNER_FAST_STDOUT', 'false').lower() in ('true', '1')
+        self._out_buffer = []
+        
+        # Bet history filters shared across sports for the current scan
+        self._bet_history_filters = None
+        
     def _load_cache(self) -> Dict:
         """Load cache from disk if it exists and is valid."""
         try:
@@ -178,8 +273,9 @@ class PositiveEVScanner:
                     cache = pickle.load(f)
                 # Clean up expired entries
                 current_time = time.time()
+                # Entries saved under the old string keys are dropped too
                 cache = {k: v for k, v in cache.items() 
-                        if current_time - v[1] < self._cache_duration}
+                        if isinstance(k, tuple) and current_time - v[1] < self._cache_duration}
                 if cache:
                     pass  # Loaded cache from disk
                 return cache
@@ -198,6 +294,27 @@ class PositiveEVScanner:
         except Exception as e:
             logger.warning(f"Could not save cache: {e}")
     
+    @staticmethod
+    def _odds_cache_key(sport: str, markets: str) -> Tuple[str, str]:
+        """Cache key (sport, markets) for an odds request; market order doesn't matter."""
+        market_list = sorted(m.strip() for m in markets.split(',') if m.strip())
+        return sport, ','.join(market_list)
+    
+    def invalidate_cache(self, sport: Optional[str] = None):
+        """
+        Drop cached odds so the next request hits the API.
+        
+        Args:
+            sport: Only invalidate this sport, or None to clear everything
+        """
+        with self._cache_lock:
+            if sport is None:
+                self._odds_cache.clear()
+            else:
+                for key in [k for k in self._odds_cache if k[0] == sport]:
+                    del self._odds_cache[key]
+        self._save_cache()
+    
     def get_available_sports(self) -> List[Dict]:
         """
         Get list of available sports.
@@ -211,7 +328,7 @@ class PositiveEVScanner:
         }
         
         try:
-            response = requests.get(url, params=params)
+            response = self._session.get(url, params=params)
             response.raise_for_status()
             return response.json()
         except Exception as e:
@@ -220,11 +337,62 @@ class PositiveEVScanner:
     
     def _rate_limit(self):
         """Enforce rate limiting between API requests."""
-        with self._request_lock:
-            elapsed = time.time() - self._last_request_time
-            if elapsed < self._min_request_interval:
-                time.sleep(self._min_request_interval - elapsed)
-            self._last_request_time = time.time()
+        self._rate_limiter.acquire()
+    
+    # Responses that indicate the API is overloaded or throttling us
+    _CONGESTION_STATUS_CODES = (429, 500, 502, 503, 504)
+    
+    def _backoff_delay(self, attempt: int, response: Optional[requests.Response] = None) -> float:
+        """
+        Seconds to wait before retry `attempt` + 1.
+        Honors a numeric Retry-After header, otherwise doubles from
+        _retry_min_backoff up to _retry_max_backoff with a little jitter.
+        """
+        if response is not None:
+            retry_after = response.headers.get('Retry-After')
+            try:
+                return min(float(retry_after), self._retry_max_backoff)
+            except (TypeError, ValueError):
+                pass
+        delay = min(self._retry_min_backoff * (2 ** attempt), self._retry_max_backoff)
+        return delay + random.uniform(0, 0.1)
+    
+    def _fetch_odds(self, url: str, params: Dict, retry_count: int = 3) -> requests.Response:
+        """
+        Issue an odds request under the adaptive concurrency limit.
+        Latency and throttling responses are fed back to the limiter.
+        Transient failures (429/5xx, timeouts, dropped connections) are
+        retried with exponential backoff; the last response or error is
+        returned/raised if every attempt fails.
+        """
+        for attempt in range(retry_count):
+            last_attempt = attempt == retry_count - 1
+            response = None
+            
+            with self._concurrency:
+                self._rate_limit()
+                start = time.monotonic()
+                try:
+                    response = self._session.get(url, params=params, timeout=30)
+                except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+                    self._concurrency.record(time.monotonic() - start, success=False)
+                    if last_attempt:
+                        raise
+                    reason = type(e).__name__
+                except Exception:
+                    self._concurrency.record(time.monotonic() - start, success=False)
+                    raise
+                else:
+                    congested = response.status_code in self._CONGESTION_STATUS_CODES
+                    self._concurrency.record(time.monotonic() - start, success=not congested)
+                    if not congested or last_attempt:
+                        return response
+                    reason = f"HTTP {response.status_code}"
+            
+            # Back off outside the concurrency slot so other requests can proceed
+            wait_time = self._backoff_delay(attempt, response)
+            logger.warning(f"Odds request failed ({reason}), retrying in {wait_time:.1f}s ({attempt + 1}/{retry_count})")
+            time.sleep(wait_time)
     
     def get_events(self, sport: str, retry_count: int = 3) -> List[Dict]:
         """
@@ -249,7 +417,7 @@ class PositiveEVScanner:
                 # Apply rate limiting
                 self._rate_limit()
                 
-                response = requests.get(url, params=params, timeout=10)
+                response = self._session.get(url, params=params, timeout=10)
                 response.raise_for_status()
                 return response.json()
                 
@@ -257,8 +425,8 @@ class PositiveEVScanner:
                 if e.response is not None and e.response.status_code == 429:
                     # Rate limit hit - wait and retry with exponential backoff
                     if attempt < retry_count - 1:
-                        wait_time = (2 ** attempt) * 1.0  # 1s, 2s, 4s
-                        logger.warning(f"Rate limit hit for {sport}, waiting {wait_time}s before retry {attempt + 1}/{retry_count}")
+                        wait_time = self._backoff_delay(attempt, e.response)  # ~1s, 2s, 4s
+                        logger.warning(f"Rate limit hit for {sport}, waiting {wait_time:.1f}s before retry {attempt + 1}/{retry_count}")
                         time.sleep(wait_time)
                         continue
                     else:
@@ -287,7 +455,7 @@ class PositiveEVScanner:
             List of games with odds from multiple bookmakers
         """
         # Check cache first (30 minute cache)
-        cache_key = f"{sport}_{markets}"
+        cache_key = self._odds_cache_key(sport, markets)
         current_time = time.time()
         
         if cache_key in self._odds_cache:
@@ -311,7 +479,7 @@ class PositiveEVScanner:
         }
         
         try:
-            response = requests.get(url, params=params)
+            response = self._fetch_odds(url, params)
             response.raise_for_status()
             
             # Print remaining requests and usage info
@@ -352,68 +520,62 @@ class PositiveEVScanner:
                     # Try each market individually
                     all_games = []
                     successful_markets = []
+                    # Games and (game, bookmaker) pairs seen so far, so each
+                    # market's response merges by lookup instead of list scans
+                    game_dict = {}
+                    bookmaker_index = {}
                     
                     for market in market_list:
                         try:
                             params['markets'] = market
-                            response = requests.get(url, params=params)
+                            response = self._fetch_odds(url, params)
                             response.raise_for_status()
                             
                             games = response.json()
                             if games:
                                 # Merge games data (avoiding duplicates by game ID)
-                                if not all_games:
-                                    all_games = games
-                                    successful_markets.append(market)
-                                else:
-                                    # Merge bookmaker data for existing games
-                                    game_dict = {g['id']: g for g in all_games}
-                                    for game in games:
-                                        if game['id'] in game_dict:
-                                            # Merge bookmakers for this game
-                                            existing_game = game_dict[game['id']]
-                                            for bookmaker in game.get('bookmakers', []):
-                                                # Check if this bookmaker already exists
-                                                existing_bookmaker = next(
-                                                    (b for b in existing_game.get('bookmakers', []) 
-                                                     if b['key'] == bookmaker['key']),
-                                                    None
-                                                )
-                                                if existing_bookmaker:
-                                                    # Merge markets intelligently - avoid duplicates
-                                                    # Build a dict of existing markets by market key
-                                                    existing_markets_dict = {m['key']: m for m in existing_bookmaker.get('markets', [])}
-                                                    
-                                                    # Add or update markets from new response
-                                                    for new_market in bookmaker.get('markets', []):
-                                                        market_key = new_market['key']
-                                                        if market_key in existing_markets_dict:
-                                                            # Market already exists - replace with newer data
-                                                            # (newer data is more recent since we're fetching markets sequentially)
-                                                            existing_markets_dict[market_key] = new_market
-                                                        else:
-                                                            # New market - add it
-                                                            existing_markets_dict[market_key] = new_market
-                                                    
-                                                    # Replace markets list with deduplicated version
-                                                    existing_bookmaker['markets'] = list(existing_markets_dict.values())
-                                                else:
-                                                    # Add new bookmaker
-                                                    existing_game.setdefault('bookmakers', []).append(bookmaker)
+                                for game in games:
+                                    existing_game = game_dict.get(game['id'])
+                                    if existing_game is None:
+                                        # Add new game
+                                        all_games.append(game)
+                                        game_dict[game['id']] = game
+                                        for bookmaker in game.get('bookmakers', []):
+                                            bookmaker_index[(game['id'], bookmaker['key'])] = bookmaker
+                                        continue
+                                    
+                                    # Merge bookmakers for this game
+                                    for bookmaker in game.get('bookmakers', []):
+                                        # Check if this bookmaker already exists
+                                        existing_bookmaker = bookmaker_index.get((game['id'], bookmaker['key']))
+                                        if existing_bookmaker:
+                                            # Merge markets intelligently - avoid duplicates
+                                            # Build a dict of existing markets by market key
+                                            existing_markets_dict = {m['key']: m for m in existing_bookmaker.get('markets', [])}
+                                            
+                                            # Add or update markets from new response
+                                            # (newer data replaces older since markets are merged in order)
+                                            for new_market in bookmaker.get('markets', []):
+                                                existing_markets_dict[new_market['key']] = new_market
+                                            
+                                            # Replace markets list with deduplicated version
+                                            existing_bookmaker['markets'] = list(existing_markets_dict.values())
                                         else:
-                                            # Add new game
-                                            all_games.append(game)
-                                            game_dict[game['id']] = game
-                                    successful_markets.append(market)
+                                            # Add new bookmaker
+                                            existing_game.setdefault('bookmakers', []).append(bookmaker)
+                                            bookmaker_index[(game['id'], bookmaker['key'])] = bookmaker
+                                successful_markets.append(market)
                         except requests.exceptions.HTTPError as market_error:
                             pass  # Market not available
                         except Exception as market_error:
                             pass  # Error fetching market
                     
                     if all_games:
-                        # Cache with successful markets only
-                        success_cache_key = f"{sport}_{'_'.join(successful_markets)}"
+                        # Cache under the requested markets (so the next scan doesn't
+                        # repeat the 422 + per-market round trips) and the successful subset
+                        success_cache_key = self._odds_cache_key(sport, ','.join(successful_markets))
                         with self._cache_lock:
+                            self._odds_cache[cache_key] = (all_games, current_time)
                             self._odds_cache[success_cache_key] = (all_games, current_time)
                         self._save_cache()
                         
@@ -476,6 +638,43 @@ class PositiveEVScanner:
             return 1 / avg_probability if avg_probability > 0 else None
         return None
     
+    @staticmethod
+    def _outcome_key(game: str, market: str, outcome: str) -> Tuple[str, str, str]:
+        """
+        Canonical (game, market, outcome) key shared by the already-bet filter
+        and the one-bet-per-outcome dedupe, so differences in case or
+        whitespace don't produce two keys for the same outcome.
+        """
+        return (' '.join(game.lower().split()), market.strip().lower(),
+                ' '.join(outcome.lower().split()))
+    
+    def _get_bet_history_filters(self) -> Tuple[Set[tuple], Set[tuple]]:
+        """
+        Load the bet-history based filters.
+        During scan_all_sports the history is read once and shared by every
+        sport instead of re-reading the CSV per sport.
+        
+        Returns:
+            Tuple of (already bet outcome keys (see _outcome_key), failed
+            opportunity keys)
+        """
+        if self._bet_history_filters is not None:
+            return self._bet_history_filters
+        
+        # Use outcome-based tracking instead of game-based
+        already_bet_outcomes = set()
+        if self.skip_already_bet_outcomes:
+            already_bet_outcomes = {
+                self._outcome_key(*key) for key in self.bet_repository.get_already_bet_outcomes()
+            }
+        
+        # Get failed bet opportunities to ignore (if max_failures > 0)
+        failed_opportunities = set()
+        if self.max_bet_failures > 0:
+            failed_opportunities = self.bet_repository.get_failed_bet_opportunities(max_failures=self.max_bet_failures)
+        
+        return already_bet_outcomes, failed_opportunities
+    
     def analyze_games_for_ev(self, games: List[Dict], sport: str, 
                             reference_time: Optional[datetime] = None) -> List[Dict]:
         """
@@ -495,16 +694,15 @@ class PositiveEVScanner:
         if not games:
             return opportunities
         
-        # Use outcome-based tracking instead of game-based
-        already_bet_outcomes = set()
-        if self.skip_already_bet_outcomes:
-            already_bet_outcomes = self.bet_repository.get_already_bet_outcomes()
+        # Outcomes already bet on and opportunities that failed too often
+        already_bet_outcomes, failed_opportunities = self._get_bet_history_filters()
         
-        # Get failed bet opportunities to ignore (if max_failures > 0)
-        failed_opportunities = set()
-        if self.max_bet_failures > 0:
-            failed_opportunities = self.bet_repository.get_failed_bet_opportunities(max_failures=self.max_bet_failures)
+        # Market types from config (e.g., h2h, spreads, totals, h2h_3_way)
+        markets_list = [m.strip() for m in self.markets.split(',')]
         
+        # Set views of the bookmaker lists for O(1) membership checks
+        sharp_book_set = frozenset(self.sharp_books)
+        betting_bookmaker_set = frozenset(self.betting_bookmakers)
         
         for game in games:
             # Get game ID from API
@@ -534,8 +732,7 @@ class PositiveEVScanner:
             if not bookmakers:
                 continue
             
-            # Process each market type from config (e.g., h2h, spreads, totals, h2h_3_way)
-            markets_list = [m.strip() for m in self.markets.split(',')]
+            # Process each market type from config
             for market_type in markets_list:
                 # Get all outcomes for this market across all bookmakers
                 market_data = {}
@@ -595,15 +792,8 @@ class PositiveEVScanner:
                         
                         bookmaker_outcome_sets[bookmaker['key']] = outcome_set
                         
-                        for outcome in market.get('outcomes', []):
-                            outcome_key = outcome['name']
-                            if 'point' in outcome:
-                                # For spreads, use +/- sign; for totals, just the number
-                                if market_type == 'spreads':
-                                    outcome_key += f" ({outcome['point']:+.1f})"
-                                else:  # totals
-                                    outcome_key += f" ({outcome['point']:.1f})"
-                            
+                        # Reuse the outcome keys built above
+                        for outcome, outcome_key in zip(market.get('outcomes', []), outcome_names):
                             if outcome_key not in market_data:
                                 market_data[outcome_key] = []
                             
@@ -621,8 +811,20 @@ class PositiveEVScanner:
                                 'outcome_set': outcome_set  # Store the full outcome set for this bookmaker
                             })
                 
+                game_string = f"{away_team} @ {home_team}"
+                
                 # Analyze each outcome
                 for outcome_name, odds_list in market_data.items():
+                    # Skip outcomes that have failed multiple times or were already
+                    # bet on before doing any sharp/EV work
+                    if (game_id, market_type, outcome_name) in failed_opportunities:
+                        self._filter_stats['filtered_failed_bets'] += 1
+                        continue
+                    
+                    if self._outcome_key(game_string, market_type, outcome_name) in already_bet_outcomes:
+                        self._filter_stats['filtered_already_bet'] += 1
+                        continue
+                    
                     # Group bookmakers by their exact outcome set (not just count)
                     # This ensures we only compare bookmakers offering the same set of outcomes
                     outcome_sets = [o.get('outcome_set') for o in odds_list if o.get('outcome_set')]
@@ -630,7 +832,6 @@ class PositiveEVScanner:
                         continue
                     
                     # Use the most common outcome set
-                    from collections import Counter
                     most_common_set = Counter(outcome_sets).most_common(1)[0][0]
                     
                     # Filter to only include bookmakers with the exact matching outcome set
@@ -638,7 +839,7 @@ class PositiveEVScanner:
                     filtered_odds_list = [o for o in odds_list if o.get('outcome_set') == most_common_set]
                     
                     # Get sharp book average as baseline (only from matching outcome set)
-                    sharp_odds = [o['odds'] for o in filtered_odds_list if o['bookmaker'] in self.sharp_books]
+                    sharp_odds = [o['odds'] for o in filtered_odds_list if o['bookmaker'] in sharp_book_set]
                     
                     if not sharp_odds:
                         self._filter_stats['no_sharp_odds'] += 1
@@ -663,7 +864,6 @@ class PositiveEVScanner:
                             # Check if there are duplicate odds values
                             if len(unique_odds) < len(odds_values):
                                 # Find which odds values are duplicated
-                                from collections import Counter
                                 odds_counter = Counter(odds_values)
                                 duplicate_odds = [odds for odds, count in odds_counter.items() if count > 1]
                                 
@@ -682,7 +882,7 @@ class PositiveEVScanner:
                                 
                                 # Recalculate sharp odds after removing corrupted bookmaker
                                 sharp_odds = [o['odds'] for o in filtered_odds_list 
-                                            if o['bookmaker'] in self.sharp_books and o['bookmaker'] != bookmaker_key]
+                                            if o['bookmaker'] in sharp_book_set and o['bookmaker'] != bookmaker_key]
                                 
                                 # If no sharp odds left after removing corrupted data, skip this outcome
                                 if not sharp_odds:
@@ -703,7 +903,7 @@ class PositiveEVScanner:
                         # First pass: collect ALL outcomes for each sharp bookmaker (matching outcome set only)
                         for other_outcome_name, other_odds_list in market_data.items():
                             for odds_data in other_odds_list:
-                                if odds_data['bookmaker'] in self.sharp_books and odds_data.get('outcome_set') == most_common_set:
+                                if odds_data['bookmaker'] in sharp_book_set and odds_data.get('outcome_set') == most_common_set:
                                     bookmaker_key = odds_data['bookmaker']
                                     if bookmaker_key not in sharp_market_odds_complete:
                                         sharp_market_odds_complete[bookmaker_key] = {}
@@ -752,11 +952,11 @@ class PositiveEVScanner:
                     
                     # Check each bookmaker's odds (only those with matching outcome count)
                     for odds_data in filtered_odds_list:
-                        if odds_data['bookmaker'] in self.sharp_books:
+                        if odds_data['bookmaker'] in sharp_book_set:
                             continue  # Skip the sharp books themselves
                         
                         # Only show opportunities for betting bookmakers
-                        if odds_data['bookmaker'] not in self.betting_bookmakers:
+                        if odds_data['bookmaker'] not in betting_bookmaker_set:
                             self._filter_stats['no_betting_bookmakers'] += 1
                             # Track which bookmaker is missing credentials
                             self._missing_credentials_bookmakers.add(odds_data['bookmaker'])
@@ -779,32 +979,15 @@ class PositiveEVScanner:
                             self._filter_stats['filtered_min_probability'] += 1
                             continue
                         
-                        # Skip opportunities that have failed multiple times
-                        opportunity_key = (game_id, market_type, outcome_name)
-                        if opportunity_key in failed_opportunities:
-                            self._filter_stats['filtered_failed_bets'] += 1
-                            continue
-                        
-                        # Skip outcomes that have already been bet on
-                        game_string = f"{away_team} @ {home_team}"
-                        outcome_key = (game_string, market_type, outcome_name)
-                        if outcome_key in already_bet_outcomes:
-                            self._filter_stats['filtered_already_bet'] += 1
-                            continue
-                            
                         # Calculate bookmaker's implied probability
                         bookmaker_probability = calculate_implied_probability(bet_odds)
                         
-                        # Calculate full Kelly first (without fraction) to filter bet quality
-                        kelly_stake_full = self.kelly.calculate_kelly_stake(
-                            decimal_odds=bet_odds,
-                            true_probability=true_probability,
-                            kelly_fraction=1.0  # Full Kelly for filtering
-                        )
+                        # Full Kelly (without fraction) to filter bet quality - only the
+                        # percentage is needed, the stake is built once below
+                        full_kelly = self.kelly.full_kelly_fraction(bet_odds, true_probability)
                         
                         # Apply minimum Kelly percentage filter on FULL Kelly (before risk management)
-                        # kelly_percentage is 0-100, min_kelly_percentage is 0-1
-                        if kelly_stake_full['kelly_percentage'] < (self.min_kelly_percentage * 100):
+                        if full_kelly < self.min_kelly_percentage:
                             self._filter_stats['filtered_min_kelly'] += 1
                             continue
                         
@@ -828,7 +1011,7 @@ class PositiveEVScanner:
                         # Collect sharp book links for verification
                         sharp_links = []
                         for sharp_data in odds_list:
-                            if sharp_data['bookmaker'] in self.sharp_books:
+                            if sharp_data['bookmaker'] in sharp_book_set:
                                 sharp_link = sharp_data.get('link')
                                 if sharp_link:
                                     sharp_links.append({
@@ -853,7 +1036,7 @@ class PositiveEVScanner:
                         opportunities.append({
                             'game_id': game_id,
                             'sport': sport,
-                            'game': f"{away_team} @ {home_team}",
+                            'game': game_string,
                             'commence_time': commence_time_str,
                             'market': market_type,
                             'outcome': outcome_name,
@@ -872,21 +1055,36 @@ class PositiveEVScanner:
         
         return opportunities
     
-    def find_positive_ev_opportunities(self, sport: str, markets: str = 'h2h') -> List[Dict]:
+    def find_positive_ev_opportunities(self, sport: str, markets: str = 'h2h',
+                                       check_events: bool = True) -> List[Dict]:
         """
         Find positive EV opportunities for a sport by fetching live odds.
         
         Args:
             sport: Sport key
             markets: Markets to analyze
+            check_events: Check the events endpoint before fetching odds
+                          (callers that already did so can skip the extra request)
             
         Returns:
             List of positive EV opportunities
         """
+        games = self._fetch_sport_odds(sport, markets, check_events)
+        return self._analyze_sport(games, sport)
+    
+    def _fetch_sport_odds(self, sport: str, markets: str = 'h2h',
+                          check_events: bool = True) -> List[Dict]:
+        """
+        Network half of find_positive_ev_opportunities: fetch the odds for a sport.
+        
+        Returns:
+            List of games with odds (empty if none or on error)
+        """
         # First check if there are any events (FREE endpoint)
-        events = self.get_events(sport)
-        if not events:
-            return []
+        if check_events:
+            events = self.get_events(sport)
+            if not events:
+                return []
         
         games = self.get_odds(sport, markets)
         
@@ -896,6 +1094,18 @@ class PositiveEVScanner:
                 logger.warning(f"{sport}: No odds - Error {error_info.get('code', 'unknown')}: {error_info.get('message', 'Unknown error')}")
             return []
         
+        return games
+    
+    def _analyze_sport(self, games: List[Dict], sport: str) -> List[Dict]:
+        """
+        CPU half of find_positive_ev_opportunities: analyze fetched games.
+        
+        Returns:
+            List of positive EV opportunities
+        """
+        if not games:
+            return []
+        
         # Use core analysis method
         opportunities = self.analyze_games_for_ev(games, sport)
         
@@ -911,16 +1121,14 @@ class PositiveEVScanner:
         Scan multiple sports for +EV opportunities using concurrent requests.
         
         Args:
-            sport_keys: List of sport keys to scan, or None to read from env
+            sport_keys: List of sport keys to scan, or None for BETTING_SPORTS
             max_workers: Max concurrent workers for event fetching (default: 3)
             
         Returns:
             Dictionary mapping sport to list of opportunities
         """
         if sport_keys is None:
-            # Read from environment variable or use defaults
-            betting_sports_str = os.getenv('BETTING_SPORTS', 'soccer_epl,soccer_england_championship,soccer_spain_la_liga,soccer_germany_bundesliga,soccer_italy_serie_a,soccer_france_ligue_one,soccer_uefa_champs_league,soccer_uefa_europa_league')
-            sport_keys = [sport.strip() for sport in betting_sports_str.split(',')]
+            sport_keys = self._default_sport_keys
         
         # Use provided max_workers or default to conservative value
         if max_workers is None:
@@ -951,28 +1159,39 @@ class PositiveEVScanner:
         
         all_opportunities = {}
         
+        # Read bet history once for the whole scan
+        self._bet_history_filters = self._get_bet_history_filters()
+        
         # Use ThreadPoolExecutor for concurrent scanning of active sports only
         scanned_count = 0
         error_count = 0
         
-        with ThreadPoolExecutor(max_workers=self.max_concurrent_requests) as executor:
-            # Submit only active sports for concurrent processing
-            future_to_sport = {
-                executor.submit(self.find_positive_ev_opportunities, sport, self.markets): sport 
-                for sport in active_sports
-            }
-            
-            # Collect results as they complete
-            for future in as_completed(future_to_sport):
-                sport = future_to_sport[future]
-                scanned_count += 1
-                try:
-                    opportunities = future.result()
-                    if opportunities:
-                        all_opportunities[sport] = opportunities
-                except Exception as e:
-                    error_count += 1
-                    logger.error(f"Error scanning {sport}: {e}", exc_info=True)
+        try:
+            # Pool is sized to the limiter's ceiling; the limiter decides how
+            # many odds requests are actually in flight
+            with ThreadPoolExecutor(max_workers=self._concurrency.max_limit) as executor:
+                # Threads only fetch odds for the active sports
+                # (events were already checked above, so don't request them again)
+                future_to_sport = {
+                    executor.submit(self._fetch_sport_odds, sport, self.markets, False): sport 
+                    for sport in active_sports
+                }
+                
+                # Analyze each sport on this thread as its odds arrive, so the
+                # CPU-bound analysis doesn't compete with fetch threads for the GIL
+                # and filter stats are only updated from one thread
+                for future in as_completed(future_to_sport):
+                    sport = future_to_sport[future]
+                    scanned_count += 1
+                    try:
+                        opportunities = self._analyze_sport(future.result(), sport)
+                        if opportunities:
+                            all_opportunities[sport] = opportunities
+                    except Exception as e:
+                        error_count += 1
+                        logger.error(f"Error scanning {sport}: {e}", exc_info=True)
+        finally:
+            self._bet_history_filters = None
         # Log summary
         success_count = len(all_opportunities)
         logger.info(f"Scanned {scanned_count} sports: {success_count} with opportunities, {error_count} errors")
@@ -992,6 +1211,21 @@ class PositiveEVScanner:
         return all_opportunities
         return all_opportunities
     
+    def _resolve_sort(self):
+        """
+        Resolve the configured sort criteria.
+        
+        Returns:
+            Tuple of (key function, reverse flag) for sorted()
+        """
+        # Get the sort key function for ORDER_BY, default to expected_profit
+        sort_key = _SORT_KEY_MAP.get(self.order_by, _SORT_KEY_MAP['expected_profit'])
+        
+        # Determine reverse flag (desc = True, asc = False)
+        reverse = (self.sort_order == 'desc')
+        
+        return sort_key, reverse
+    
     def sort_opportunities(self, opportunities: List[Dict]) -> List[Dict]:
         """
         Sort opportunities based on configured sort criteria.
@@ -1002,24 +1236,31 @@ class PositiveEVScanner:
         Returns:
             Sorted list of opportunities
         """
-        # Determine sort key based on ORDER_BY setting
-        sort_key_map = {
-            'ev': lambda x: x['ev_percentage'],
-            'kelly': lambda x: x['kelly_stake']['kelly_percentage'],
-            'expected_profit': lambda x: x['expected_profit'],
-            'odds': lambda x: x['odds'],
-            'match_time': lambda x: x['commence_time']
-        }
-        
-        # Get the sort key function, default to expected_profit
-        sort_key = sort_key_map.get(self.order_by, sort_key_map['expected_profit'])
-        
-        # Determine reverse flag (desc = True, asc = False)
-        reverse = (self.sort_order == 'desc')
-        
-        # Sort and return
+        sort_key, reverse = self._resolve_sort()
         return sorted(opportunities, key=sort_key, reverse=reverse)
     
+    @classmethod
+    def _best_by_outcome(cls, opportunities: List[Dict], key_fn, reverse: bool) -> Dict[tuple, Dict]:
+        """
+        Best opportunity per unique outcome in a single pass.
+        Ties keep the first opportunity seen.
+        """
+        best = {}
+        best_keys = {}
+        
+        for opp in opportunities:
+            outcome_key = cls._outcome_key(opp['game'], opp['market'], opp['outcome'])
+            value = key_fn(opp)
+            
+            if outcome_key not in best:
+                best[outcome_key] = opp
+                best_keys[outcome_key] = value
+            elif (value > best_keys[outcome_key]) if reverse else (value < best_keys[outcome_key]):
+                best[outcome_key] = opp
+                best_keys[outcome_key] = value
+        
+        return best
+    
     def filter_one_bet_per_game(self, opportunities: List[Dict]) -> List[Dict]:
         """
         Filter opportunities to show only the best bet per unique outcome.
@@ -1031,7 +1272,8 @@ class PositiveEVScanner:
           - Team A win now + Team B win later = ALLOWED (different outcomes)
         
         Args:
-            opportunities: List of opportunities (should already be sorted)
+            opportunities: List of opportunities (should already be sorted;
+                use best_per_game() for unsorted input)
             
         Returns:
             Filtered list with only one opportunity per unique outcome
@@ -1049,7 +1291,7 @@ class PositiveEVScanner:
             # Create unique key from game + market + outcome
             # This allows: Team A win + Over total (different outcomes in same game)
             # This blocks: Team A win + Team A win (duplicate outcome)
-            outcome_key = (opp['game'], opp['market'], opp['outcome'])
+            outcome_key = self._outcome_key(opp['game'], opp['market'], opp['outcome'])
             
             if outcome_key not in seen_outcomes:
                 seen_outcomes.add(outcome_key)
@@ -1060,6 +1302,27 @@ class PositiveEVScanner:
         
         return filtered
     
+    def best_per_game(self, opportunities: List[Dict], key_fn, reverse: bool = True) -> List[Dict]:
+        """
+        Keep the best opportunity per unique outcome and sort the survivors.
+        Equivalent to sorting then filter_one_bet_per_game(), but only the
+        reduced set is sorted.
+        
+        Args:
+            opportunities: List of opportunities (any order)
+            key_fn: Sort key function (see _resolve_sort)
+            reverse: True if higher key values are better
+            
+        Returns:
+            Sorted list with only one opportunity per unique outcome
+        """
+        best = self._best_by_outcome(opportunities, key_fn, reverse)
+        
+        # Track filtered count
+        self._filter_stats['filtered_one_per_game'] += (len(opportunities) - len(best))
+        
+        return sorted(best.values(), key=key_fn, reverse=reverse)
+    
     def get_filter_stats(self) -> Dict[str, int]:
         """Get current filter statistics."""
         return self._filter_stats.copy()
@@ -1070,91 +1333,154 @@ class PositiveEVScanner:
             self._filter_stats[key] = 0
         self._missing_credentials_bookmakers.clear()
     
+    def _emit(self, text: str):
+        """Queue output for stdout, flushing when the buffer is full."""
+        self._out_buffer.append(text)
+        if self._live_output and sys.stdout.isatty():
+            self._flush_output()
+        elif 0 < self._print_buffer_size <= len(self._out_buffer):
+            self._flush_output()
+    
+    def _flush_output(self):
+        """Write any queued output to stdout."""
+        if self._out_buffer:
+            text = ''.join(self._out_buffer)
+            self._out_buffer.clear()
+            if not (self._fast_stdout and self._write_stdout_fd(text)):
+                sys.stdout.write(text)
+        sys.stdout.flush()
+    
+    @staticmethod
+    def _write_stdout_fd(text: str) -> bool:
+        """
+        Write text directly to the stdout file descriptor, bypassing the
+        TextIOWrapper. Only used when stdout isn't a terminal.
+        
+        Returns:
+            True if written, False if the caller should fall back to sys.stdout
+        """
+        try:
+            if sys.stdout.isatty():
+                return False
+            fd = sys.stdout.fileno()
+        except (AttributeError, OSError, ValueError):
+            # Replaced/captured stdout without a real file descriptor
+            return False
+        
+        # Keep ordering with anything already buffered in sys.stdout
+        sys.stdout.flush()
+        data = memoryview(text.encode('utf-8'))
+        while data:
+            written = os.write(fd, data)
+            data = data[written:]
+        return True
+    
     def print_opportunities(self, opportunities: Dict[str, List[Dict]]):
         """
         Print all positive EV opportunities in a readable format.
         
+        Output is queued and written to stdout in a single write rather than
+        one print() call per line (or in batches of SCANNER_PRINT_BUFFER
+        chunks when that is set).
+        
         Args:
             opportunities: Dictionary of opportunities by sport
         """
         total_count = sum(len(opps) for opps in opportunities.values())
         
-        print(f"\n{'='*80}")
-        print(f"POSITIVE EV OPPORTUNITIES FOUND: {total_count}")
-        print(f"{'='*80}\n")
+        try:
+            self._write_opportunities(opportunities, total_count, self._emit)
+        finally:
+            self._flush_output()
+    
+    def _write_opportunities(self, opportunities: Dict[str, List[Dict]], total_count: int, write):
+        """Format opportunities for print_opportunities through `write`."""
+        write(f"\n{'='*80}\n")
+        write(f"POSITIVE EV OPPORTUNITIES FOUND: {total_count}\n")
+        write(f"{'='*80}\n\n")
         
         if total_count == 0:
-            print("No +EV opportunities found at this time.")
+            write("No +EV opportunities found at this time.\n")
             return
         
         # Display sort settings
-        sort_labels = {
-            'ev': 'Expected Value %',
-            'kelly': 'Kelly %',
-            'expected_profit': 'Expected Profit',
-            'odds': 'Odds',
-            'match_time': 'Match Time'
-        }
-        sort_label = sort_labels.get(self.order_by, 'Expected Profit')
+        sort_label = _SORT_LABELS.get(self.order_by, 'Expected Profit')
         order_label = 'Highest first' if self.sort_order == 'desc' else 'Lowest first'
-        print(f"🔢 Sorted by: {sort_label} ({order_label})")
+        write(f"🔢 Sorted by: {sort_label} ({order_label})\n")
         
         if self.one_bet_per_game:
-            print(f"🎯 Filter: ONE BET PER GAME (showing best opportunity per match)")
+            write(f"🎯 Filter: ONE BET PER GAME (showing best opportunity per match)\n")
         else:
-            print(f"🎯 Filter: ALL BETS (showing all opportunities including duplicates)")
-        print()
+            write(f"🎯 Filter: ALL BETS (showing all opportunities including duplicates)\n")
+        write("\n")
+        
+        # Resolve the sort once rather than per sport
+        sort_key, reverse = self._resolve_sort()
+        kelly_fraction_display = f"({self.kelly_fraction * 100:.0f}% Kelly)" if self.kelly_fraction != 1.0 else "(Full Kelly)"
         
         for sport, opps in opportunities.items():
-            # Sort opportunities using configured method
-            opps = self.sort_opportunities(opps)
-            
-            # Apply one-bet-per-game filter if enabled
             original_count = len(opps)
-            opps = self.filter_one_bet_per_game(opps)
-            filtered_count = len(opps)
             
-            print(f"\n{'─'*80}")
+            # Keep only the best bet per outcome if the one-bet-per-game
+            # filter is enabled; only the reduced set is sorted
+            if self.one_bet_per_outcome:
+                opps = self.best_per_game(opps, sort_key, reverse)
+                filtered_count = len(opps)
+                if 0 < self.display_top_n < filtered_count:
+                    opps = opps[:self.display_top_n]
+            else:
+                filtered_count = len(opps)
+                # Sort using configured method - a partial heap selection when
+                # only the top N are displayed
+                if 0 < self.display_top_n < filtered_count:
+                    select = heapq.nlargest if reverse else heapq.nsmallest
+                    opps = select(self.display_top_n, opps, key=sort_key)
+                else:
+                    opps = sorted(opps, key=sort_key, reverse=reverse)
+            
+            write(f"\n{'─'*80}\n")
             if self.one_bet_per_game and original_count != filtered_count:
-                print(f"📊 {sport.upper().replace('_', ' ')}: {filtered_count} opportunities (filtered from {original_count})")
+                write(f"📊 {sport.upper().replace('_', ' ')}: {filtered_count} opportunities (filtered from {original_count})\n")
             else:
-                print(f"📊 {sport.upper().replace('_', ' ')}: {filtered_count} opportunities")
-            print(f"{'─'*80}\n")
+                write(f"📊 {sport.upper().replace('_', ' ')}: {filtered_count} opportunities\n")
+            if len(opps) < filtered_count:
+                write(f"   Showing top {len(opps)}\n")
+            write(f"{'─'*80}\n\n")
             
             for i, opp in enumerate(opps, 1):
-                # Convert odds to fractional
-                frac_odds = decimal_to_fractional(opp['odds'])
-                frac_sharp = decimal_to_fractional(opp['sharp_avg_odds'])
-                
                 # Get Kelly stake info
                 kelly_info = opp['kelly_stake']
                 
-                print(f"{i}. 🎯 {opp['game']}")
-                print(f"   📅 {opp['commence_time']}")
-                print(f"   🎲 Market: {opp['market'].upper()}")
-                print(f"   🏆 Bet: {opp['outcome']}")
-                print(f"   💰 Bookmaker: {opp['bookmaker']}")
-                print(f"   📈 Odds: {opp['odds']:.2f} ({frac_odds}) | Sharp: {opp['sharp_avg_odds']:.2f} ({frac_sharp})")
-                print(f"   ✅ Expected Value: +{opp['ev_percentage']:.2f}%")
-                print(f"   🎲 True Probability: {opp['true_probability']:.1f}% | Bookmaker: {opp['bookmaker_probability']:.1f}%")
-                print(f"   ")
-                kelly_fraction_display = f"({self.kelly_fraction * 100:.0f}% Kelly)" if self.kelly_fraction != 1.0 else "(Full Kelly)"
-                print(f"   💵 RECOMMENDED BET SIZE {kelly_fraction_display}:")
-                print(f"      Stake: £{kelly_info['recommended_stake']:.2f}")
-                print(f"      Kelly %: {kelly_info['kelly_percentage']:.2f}% of bankroll")
-                print(f"      Expected Profit: £{opp['expected_profit']:.2f}")
-                print(f"   ")
-                print(f"   ➤ PLACE BET HERE: {opp['bookmaker_url']}")
+                write(_OPP_TEMPLATE.format(
+                    i=i,
+                    game=opp['game'],
+                    commence_time=opp['commence_time'],
+                    market=opp['market'].upper(),
+                    outcome=opp['outcome'],
+                    bookmaker=opp['bookmaker'],
+                    odds=opp['odds'],
+                    frac_odds=decimal_to_fractional(opp['odds']),
+                    sharp_odds=opp['sharp_avg_odds'],
+                    frac_sharp=decimal_to_fractional(opp['sharp_avg_odds']),
+                    ev=opp['ev_percentage'],
+                    true_probability=opp['true_probability'],
+                    bookmaker_probability=opp['bookmaker_probability'],
+                    kelly_fraction_display=kelly_fraction_display,
+                    stake=kelly_info['recommended_stake'],
+                    kelly_percentage=kelly_info['kelly_percentage'],
+                    expected_profit=opp['expected_profit'],
+                    bookmaker_url=opp['bookmaker_url']
+                ))
                 
                 # Display sharp book links for verification
                 if opp['sharp_links']:
-                    print(f"   ")
-                    print(f"   📊 VERIFY WITH SHARP BOOKS:")
+                    write(f"   \n")
+                    write(f"   📊 VERIFY WITH SHARP BOOKS:\n")
                     for sharp in opp['sharp_links']:
                         sharp_frac = decimal_to_fractional(sharp['odds'])
-                        print(f"      • {sharp['name']}: {sharp['odds']:.2f} ({sharp_frac}) - {sharp['link']}")
+                        write(f"      • {sharp['name']}: {sharp['odds']:.2f} ({sharp_frac}) - {sharp['link']}\n")
                 
-                print()
+                write("\n")
 
 
 def main():
@@ -8,19 +8,26 @@ Backtests your positive EV betting strategy using real historical odds data.
 import os
 import requests
 import requests_cache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import time
 from datetime import datetime, timedelta, timezone
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from dotenv import load_dotenv
 import json
+import numpy as np
 from pathlib import Path
 from src.core.positive_ev_scanner import PositiveEVScanner
 from src.utils.google_search_scraper import GoogleSearchScraper
 from src.utils.espn_scores import ESPNScoresFetcher
 from src.utils.bet_settler import BetSettler
 from src.utils.bet_logger import BetLogger
+from src.utils.rate_limiter import RateLimiter
 from tqdm import tqdm
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import deque, OrderedDict
+from contextlib import closing
+from functools import lru_cache
 import threading
 
 load_dotenv()
@@ -32,9 +39,50 @@ cached_session = requests_cache.CachedSession(
     expire_after=None,  # Never expire for historical data
     cache_control=False,  # Ignore Cache-Control headers
     allowable_codes=(200, 404, 422),  # Cache all responses including errors
-    ignored_parameters=['apiKey']  # Don't include API key in cache key
+    ignored_parameters=['apiKey'],  # Don't include API key in cache key
+    wal=True  # Write-ahead log: concurrent fetch threads don't block cache reads
 )
 
+# Keep-alive connection pool sized for concurrent snapshot fetches, retrying
+# throttled/5xx responses with backoff (Retry-After is honored)
+cached_session.mount('https://', HTTPAdapter(
+    pool_connections=8,
+    pool_maxsize=16,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=['GET'],
+        raise_on_status=False
+    )
+))
+
+
+@lru_cache(maxsize=65536)
+def _parse_timestamp(ts: str) -> datetime:
+    """
+    Parse timestamp string to timezone-aware datetime.
+    Cached: bets on the same game share one commence_time string.
+    """
+    # Fast path for the API's fixed 'YYYY-MM-DDTHH:MM:SSZ' layout
+    if len(ts) == 20 and ts[10] == 'T' and ts[19] == 'Z':
+        return datetime(int(ts[0:4]), int(ts[5:7]), int(ts[8:10]),
+                        int(ts[11:13]), int(ts[14:16]), int(ts[17:19]),
+                        tzinfo=timezone.utc)
+    if 'Z' in ts:
+        return datetime.fromisoformat(ts.replace('Z', '+00:00'))
+    if ' UTC' in ts:
+        dt = datetime.strptime(ts.replace(' UTC', ''), '%Y-%m-%d %H:%M')
+        return dt.replace(tzinfo=timezone.utc)
+    try:
+        dt = datetime.fromisoformat(ts)
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        return dt
+    except:
+        dt = datetime.strptime(ts, '%Y-%m-%d %H:%M:%S')
+        return dt.replace(tzinfo=timezone.utc)
+
 
 class HistoricalBacktester:
     """Backtest betting strategy using historical odds data."""
@@ -77,6 +125,31 @@ class HistoricalBacktester:
         self.outcomes_bet_on = set()
         self.game_results_cache = {}
         
+        # Request invariants for every historical odds call
+        self._market_list = [m.strip() for m in self.scanner.markets.split(',')]
+        self._bookmakers_csv = ','.join(self.scanner.optimized_bookmakers)
+        
+        # Concurrent historical odds requests while backtesting
+        self.max_fetch_workers = int(os.getenv('BACKTEST_FETCH_WORKERS', '8'))
+        
+        # Bet the highest-EV opportunity per outcome in a snapshot rather than
+        # the first one found (changes results vs. runs without it)
+        self.best_ev_per_outcome = os.getenv('BACKTEST_BEST_EV_PER_OUTCOME', 'false').lower() == 'true'
+        
+        # Pace requests that actually reach the API; cache hits are not throttled
+        self._rate_limiter = RateLimiter(
+            min_interval=0.1,
+            max_per_minute=int(os.getenv('ODDS_API_RPM', '0'))
+        )
+        
+        # Parsed snapshots kept in memory across runs (survives reset_state).
+        # backtest() grows the bound to cover every (sport, snapshot) in the
+        # run: a sequential scan through a smaller LRU evicts each entry
+        # before the next run can reuse it
+        self._odds_memo = OrderedDict()
+        self._odds_memo_size = int(os.getenv('BACKTEST_ODDS_MEMO_SIZE', '256'))
+        self._odds_memo_lock = threading.Lock()
+        
     def reset_state(self):
         """Reset backtester state for new run."""
         self.bets_placed = []
@@ -89,83 +162,132 @@ class HistoricalBacktester:
     
     def _parse_timestamp(self, ts: str) -> datetime:
         """Parse timestamp string to timezone-aware datetime."""
-        if 'Z' in ts:
-            return datetime.fromisoformat(ts.replace('Z', '+00:00'))
-        if ' UTC' in ts:
-            dt = datetime.strptime(ts.replace(' UTC', ''), '%Y-%m-%d %H:%M')
-            return dt.replace(tzinfo=timezone.utc)
-        try:
-            dt = datetime.fromisoformat(ts)
-            if dt.tzinfo is None:
-                dt = dt.replace(tzinfo=timezone.utc)
-            return dt
-        except:
-            dt = datetime.strptime(ts, '%Y-%m-%d %H:%M:%S')
-            return dt.replace(tzinfo=timezone.utc)
+        return _parse_timestamp(ts)
     
     def get_historical_odds(self, sport: str, date: str) -> Optional[Dict]:
         """
         Get historical odds for a specific date.
         Uses requests-cache for automatic caching.
         Fetches markets individually to avoid 422 errors.
+        Parsed results are memoized so repeated runs skip the cache read/parse.
         """
+        memo_key = (sport, date, self.scanner.markets)
+        with self._odds_memo_lock:
+            if memo_key in self._odds_memo:
+                self._odds_memo.move_to_end(memo_key)
+                return self._odds_memo[memo_key]
+        
         url = f"{self.base_url}/historical/sports/{sport}/odds"
         params = {
             'apiKey': self.api_key,
-            'bookmakers': ','.join(self.scanner.optimized_bookmakers),
+            'bookmakers': self._bookmakers_csv,
             'markets': self.scanner.markets,
             'oddsFormat': self.scanner.odds_format,
             'date': date
         }
         
         # Fetch markets individually (API often returns 422 for combined markets)
-        return self._fetch_markets_individually(url, params)
+        data = self._fetch_markets_individually(url, params)
+        
+        with self._odds_memo_lock:
+            self._odds_memo[memo_key] = data
+            if len(self._odds_memo) > self._odds_memo_size:
+                self._odds_memo.popitem(last=False)
+        return data
+    
+    def _iter_historical_odds(self, jobs):
+        """
+        Fetch historical odds for (sport, timestamp) jobs concurrently.
+        Results are yielded in job order; at most 2x max_fetch_workers
+        requests are fetched ahead of the consumer. Closing the generator
+        early cancels any fetches that haven't started.
+        """
+        jobs = iter(jobs)
+        window = max(1, self.max_fetch_workers) * 2
+        pending = deque()
+        
+        with ThreadPoolExecutor(max_workers=max(1, self.max_fetch_workers)) as executor:
+            def submit_next():
+                job = next(jobs, None)
+                if job is not None:
+                    pending.append((job, executor.submit(self.get_historical_odds, *job)))
+            
+            try:
+                for _ in range(window):
+                    submit_next()
+                
+                while pending:
+                    job, future = pending.popleft()
+                    submit_next()
+                    yield job, future.result()
+            finally:
+                # Consumer stopped early (break/exception/close): don't leave
+                # queued fetches running behind it
+                for _, future in pending:
+                    future.cancel()
+    
+    def _get_odds_response(self, url: str, params: dict) -> requests.Response:
+        """
+        GET an odds endpoint through the HTTP cache.
+        Cached responses are returned immediately; only cache misses wait
+        on the rate limiter before going to the API.
+        """
+        response = cached_session.get(url, params=params, timeout=10, only_if_cached=True)
+        if response.status_code != 504:  # requests-cache returns 504 on a miss
+            return response
+        
+        self._rate_limiter.acquire()
+        return cached_session.get(url, params=params, timeout=10)
     
     def _fetch_markets_individually(self, url: str, params: dict) -> Optional[Dict]:
-        """Fetch markets individually when combined request fails."""
-        market_list = [m.strip() for m in self.scanner.markets.split(',')]
+        """
+        Fetch markets individually when combined request fails.
+        Markets are requested one after another: this already runs on an
+        _iter_historical_odds worker, so concurrency stays at
+        BACKTEST_FETCH_WORKERS and within the HTTP connection pool.
+        """
+        market_list = self._market_list
         if len(market_list) <= 1:
             return None
         
-        combined_data = {'data': []}
-        game_dict = {}
+        # Games merged straight into one dict (insertion order = first seen)
+        games_by_id = {}
+        bookmaker_index = {}  # (game_id, bookmaker key) -> bookmaker
         
         for market in market_list:
             try:
                 # Create new params dict for each market to avoid mutation
                 market_params = params.copy()
                 market_params['markets'] = market
-                response = cached_session.get(url, params=market_params, timeout=10)
+                response = self._get_odds_response(url, market_params)
                 response.raise_for_status()
                 market_data = response.json()
-                
-                if market_data and 'data' in market_data:
-                    for game in market_data['data']:
-                        game_id = game.get('id')
-                        if game_id in game_dict:
-                            # Merge bookmakers
-                            existing_game = game_dict[game_id]
-                            for bookmaker in game.get('bookmakers', []):
-                                existing_bookmaker = next(
-                                    (b for b in existing_game.get('bookmakers', []) 
-                                     if b['key'] == bookmaker['key']),
-                                    None
-                                )
-                                if existing_bookmaker:
-                                    existing_bookmaker['markets'].extend(bookmaker.get('markets', []))
-                                else:
-                                    existing_game.setdefault('bookmakers', []).append(bookmaker)
-                        else:
-                            game_dict[game_id] = game
-                            combined_data['data'].append(game)
             except requests.exceptions.HTTPError as e:
                 if e.response.status_code == 429:
                     print(f"⚠️  Rate limit hit for market '{market}'")
                 continue
             except Exception:
                 continue
+            
+            if market_data and 'data' in market_data:
+                for game in market_data['data']:
+                    game_id = game.get('id')
+                    existing_game = games_by_id.setdefault(game_id, game)
+                    if existing_game is game:
+                        for bookmaker in game.get('bookmakers', []):
+                            bookmaker_index[(game_id, bookmaker['key'])] = bookmaker
+                        continue
+                    
+                    # Merge bookmakers
+                    for bookmaker in game.get('bookmakers', []):
+                        existing_bookmaker = bookmaker_index.get((game_id, bookmaker['key']))
+                        if existing_bookmaker:
+                            existing_bookmaker['markets'].extend(bookmaker.get('markets', []))
+                        else:
+                            existing_game.setdefault('bookmakers', []).append(bookmaker)
+                            bookmaker_index[(game_id, bookmaker['key'])] = bookmaker
         
-        return combined_data if combined_data['data'] else None
+        return {'data': list(games_by_id.values())} if games_by_id else None
     
     def find_positive_ev_bets(self, historical_data: Dict, sport: str, 
                              snapshot_time: Optional[datetime] = None) -> List[Dict]:
@@ -176,7 +298,8 @@ class HistoricalBacktester:
         if not historical_data or 'data' not in historical_data:
             return []
         
-        # Keep scanner's Kelly bankroll at initial value
+        # Keep scanner's Kelly bankroll at initial value (callers may set
+        # initial_bankroll after construction)
         self.scanner.kelly.bankroll = self.initial_bankroll
         
         opportunities = self.scanner.analyze_games_for_ev(
@@ -187,51 +310,63 @@ class HistoricalBacktester:
         
         # Convert scanner's output format
         for opp in opportunities:
-            if 'ev_percentage' in opp:
-                opp['ev'] = opp['ev_percentage'] / 100
-            if 'kelly_stake' in opp:
-                opp['kelly_pct'] = opp['kelly_stake']['kelly_percentage'] / 100
-                opp['stake'] = opp['kelly_stake']['recommended_stake']
-            if 'true_probability' in opp and opp['true_probability'] >= 1:
-                opp['true_probability'] = opp['true_probability'] / 100
+            ev_percentage = opp.get('ev_percentage')
+            if ev_percentage is not None:
+                opp['ev'] = ev_percentage / 100
+            kelly_stake = opp.get('kelly_stake')
+            if kelly_stake is not None:
+                opp['kelly_pct'] = kelly_stake['kelly_percentage'] / 100
+                opp['stake'] = kelly_stake['recommended_stake']
+            true_probability = opp.get('true_probability')
+            if true_probability is not None and true_probability >= 1:
+                opp['true_probability'] = true_probability / 100
         
         return opportunities
     
+    def _game_info(self, bet: Dict) -> Optional[Dict]:
+        """
+        Teams, sport, kick-off and results-cache key for a bet.
+        The cache key is the API game id, so bets on the same game share one
+        lookup; bets without an id fall back to sport|away|home|date.
+        
+        Returns:
+            Dict of game info, or None if the bet has no parsable game/kick-off
+        """
+        commence_time = bet.get('commence_time', '')
+        away_team, separator, home_team = bet.get('game', '').partition(' @ ')
+        if not separator or not commence_time:
+            return None
+        
+        away_team = away_team.strip()
+        home_team = home_team.strip()
+        sport = bet.get('sport', '')
+        game_date = self._parse_timestamp(commence_time) if isinstance(commence_time, str) else commence_time
+        
+        return {
+            'key': bet.get('game_id') or f"{sport}|{away_team}|{home_team}|{game_date.date()}",
+            'sport': sport,
+            'away_team': away_team,
+            'home_team': home_team,
+            'game_date': game_date
+        }
+    
     def _prefetch_game_results(self, bets: List[Dict], current_time: datetime):
         """Pre-fetch all unique game results in parallel."""
         unique_games = {}
         
         for bet in bets:
-            game_str = bet.get('game', '')
-            if ' @ ' not in game_str:
+            try:
+                game_info = self._game_info(bet)
+            except Exception:
+                continue
+            if game_info is None:
                 continue
             
             # Check if game has completed
-            commence_time = bet.get('commence_time', '')
-            if commence_time and current_time:
-                try:
-                    game_time = self._parse_timestamp(commence_time) if isinstance(commence_time, str) else commence_time
-                    game_completion_time = game_time + timedelta(hours=4)
-                    if current_time < game_completion_time:
-                        continue
-                except Exception:
-                    continue
-            
-            # Extract game info
-            away_team, home_team = game_str.split(' @ ')
-            away_team = away_team.strip()
-            home_team = home_team.strip()
-            sport = bet.get('sport', '')
-            game_date = self._parse_timestamp(bet.get('commence_time', ''))
+            if current_time and current_time < game_info['game_date'] + timedelta(hours=4):
+                continue
             
-            game_key = f"{sport}|{away_team}|{home_team}|{game_date.date()}"
-            if game_key not in unique_games:
-                unique_games[game_key] = {
-                    'sport': sport,
-                    'away_team': away_team,
-                    'home_team': home_team,
-                    'game_date': game_date
-                }
+            unique_games.setdefault(game_info['key'], game_info)
         
         if not unique_games:
             return
@@ -301,59 +436,52 @@ class HistoricalBacktester:
     
     def determine_bet_result(self, bet: Dict, current_time: Optional[datetime] = None) -> Optional[str]:
         """Determine if a bet won or lost based on actual game results."""
+        # Parse the game once for both the look-ahead check and the lookup
+        try:
+            game_info = self._game_info(bet)
+        except Exception:
+            return None
+        if game_info is None:
+            return None
+        
         # Anti-look-ahead protection
-        commence_time = bet.get('commence_time', '')
-        if commence_time and current_time:
-            try:
-                game_time = self._parse_timestamp(commence_time) if isinstance(commence_time, str) else commence_time
-                game_completion_time = game_time + timedelta(hours=4)
-                if current_time < game_completion_time:
-                    return None
-            except Exception:
-                return None
+        if current_time and current_time < game_info['game_date'] + timedelta(hours=4):
+            return None
         
         # Try ESPN API
         if self.espn_scraper:
             try:
-                game_str = bet.get('game', '')
-                if ' @ ' in game_str:
-                    away_team, home_team = game_str.split(' @ ')
-                    away_team = away_team.strip()
-                    home_team = home_team.strip()
-                    sport = bet.get('sport', '')
+                away_team = game_info['away_team']
+                home_team = game_info['home_team']
+                
+                # Check cache first
+                result = self.game_results_cache.get(game_info['key'])
+                
+                # Fetch if not cached
+                if not result:
+                    result = self.espn_scraper.get_game_result(
+                        sport=game_info['sport'],
+                        team1=away_team,
+                        team2=home_team,
+                        game_date=game_info['game_date']
+                    )
+                
+                if result and 'home_score' in result and 'away_score' in result:
+                    home_score = result['home_score']
+                    away_score = result['away_score']
+                    espn_home = result.get('home_team', home_team)
+                    espn_away = result.get('away_team', away_team)
                     
-                    if commence_time:
-                        game_date = self._parse_timestamp(commence_time)
-                        
-                        # Check cache first
-                        game_key = f"{sport}|{away_team}|{home_team}|{game_date.date()}"
-                        result = self.game_results_cache.get(game_key)
-                        
-                        # Fetch if not cached
-                        if not result:
-                            result = self.espn_scraper.get_game_result(
-                                sport=sport,
-                                team1=away_team,
-                                team2=home_team,
-                                game_date=game_date
-                            )
-                        
-                        if result and 'home_score' in result and 'away_score' in result:
-                            home_score = result['home_score']
-                            away_score = result['away_score']
-                            espn_home = result.get('home_team', home_team)
-                            espn_away = result.get('away_team', away_team)
-                            
-                            # Use BetSettler to determine result
-                            return BetSettler.determine_bet_result_backtest(
-                                bet=bet,
-                                home_team=home_team,
-                                away_team=away_team,
-                                home_score=home_score,
-                                away_score=away_score,
-                                espn_home=espn_home,
-                                espn_away=espn_away
-                            )
+                    # Use BetSettler to determine result
+                    return BetSettler.determine_bet_result_backtest(
+                        bet=bet,
+                        home_team=home_team,
+                        away_team=away_team,
+                        home_score=home_score,
+                        away_score=away_score,
+                        espn_home=espn_home,
+                        espn_away=espn_away
+                    )
             except Exception:
                 pass
         
@@ -428,50 +556,64 @@ class HistoricalBacktester:
         # Parse dates
         start = datetime.fromisoformat(start_date).replace(tzinfo=timezone.utc)
         end = datetime.fromisoformat(end_date).replace(tzinfo=timezone.utc)
-        current = start
         
         total_opportunities = 0
         
-        # Calculate total snapshots
-        total_seconds = (end - start).total_seconds()
-        interval_seconds = snapshot_interval_hours * 3600
-        total_snapshots = int(total_seconds / interval_seconds) + 1
-        total_iterations = total_snapshots * len(sports)
+        # Build snapshot times
+        snapshots = []
+        current = start
+        while current <= end:
+            snapshots.append(current)
+            current += timedelta(hours=snapshot_interval_hours)
+        total_iterations = len(snapshots) * len(sports)
+        
+        # Keep the whole run's snapshots memoized for the next run
+        with self._odds_memo_lock:
+            self._odds_memo_size = max(self._odds_memo_size, total_iterations)
         
         pbar = tqdm(total=total_iterations, desc="Backtesting", unit="check", ncols=120)
         
-        # Main backtest loop
-        while current <= end:
-            timestamp = current.strftime('%Y-%m-%dT%H:%M:%SZ')
-            all_opportunities = []
-            
-            for sport in sports:
-                historical_data = self.get_historical_odds(sport, timestamp)
+        # Odds are fetched ahead concurrently; bets are still evaluated in
+        # snapshot order since bankroll/duplicate tracking depends on it
+        odds_stream = self._iter_historical_odds(
+            (sport, snapshot.strftime('%Y-%m-%dT%H:%M:%SZ'))
+            for snapshot in snapshots
+            for sport in sports
+        )
+        
+        # Main backtest loop (closing the stream cancels outstanding fetches
+        # if the loop exits early)
+        with closing(odds_stream):
+            for current in snapshots:
+                timestamp = current.strftime('%Y-%m-%dT%H:%M:%SZ')
+                # New opportunity per outcome (the first found, or the highest
+                # EV with BACKTEST_BEST_EV_PER_OUTCOME), kept as the
+                # opportunities are generated rather than filtered afterwards
+                best_opportunities = {}
                 
-                if historical_data:
-                    opportunities = self.find_positive_ev_bets(historical_data, sport, snapshot_time=current)
+                for sport in sports:
+                    _, historical_data = next(odds_stream)
+                    
+                    if historical_data:
+                        opportunities = self.find_positive_ev_bets(historical_data, sport, snapshot_time=current)
 
-                    for opp in opportunities:
-                        opp['sport'] = sport
+                        for opp in opportunities:
+                            outcome_key = (opp['game'], opp['market'], opp['outcome'])
+                            if outcome_key in self.outcomes_bet_on:
+                                continue
+                            best = best_opportunities.get(outcome_key)
+                            if best is None or (self.best_ev_per_outcome and opp.get('ev', 0) > best.get('ev', 0)):
+                                opp['sport'] = sport
+                                best_opportunities[outcome_key] = opp
                     
-                    all_opportunities.extend(opportunities)
-                
-                pbar.update(1)
-                pbar.set_postfix({'bets': len(self.bets_placed), 'opps': total_opportunities})
-            
-            if all_opportunities:
-                # Filter already bet outcomes
-                new_opportunities = []
-                for opp in all_opportunities:
-                    outcome_key = (opp['game'], opp['market'], opp['outcome'])
-                    if outcome_key not in self.outcomes_bet_on:
-                        new_opportunities.append(opp)
-                        self.outcomes_bet_on.add(outcome_key)
+                    pbar.update(1)
+                    pbar.set_postfix({'bets': len(self.bets_placed), 'opps': total_opportunities})
                 
-                if new_opportunities:
-                    total_opportunities += len(new_opportunities)
+                if best_opportunities:
+                    self.outcomes_bet_on.update(best_opportunities)
+                    total_opportunities += len(best_opportunities)
                     
-                    for opp in new_opportunities:
+                    for opp in best_opportunities.values():
                         opp['bet_placed_at'] = timestamp
                         self.place_bet(opp, result=None, bet_timestamp=timestamp)
                     
@@ -481,12 +623,10 @@ class HistoricalBacktester:
                         'bankroll': f'£{self.current_bankroll:.0f}'
                     })
             
-            current += timedelta(hours=snapshot_interval_hours)
-        
         pbar.close()
         
         # Settle pending bets
-        pending_bets = [b for b in self.bets_placed if b.get('result') is None]
+        _, pending_bets = self._partition_bets()
         if pending_bets:
             print(f"\n{'='*80}")
             print(f"SETTLING PENDING BETS")
@@ -590,14 +730,34 @@ class HistoricalBacktester:
         
         return self.generate_report()
     
+    def _partition_bets(self):
+        """Split placed bets into (settled, pending) in a single pass."""
+        settled, pending = [], []
+        for bet in self.bets_placed:
+            (pending if bet.get('result') is None else settled).append(bet)
+        return settled, pending
+    
+    def _max_drawdown(self) -> Tuple[float, float]:
+        """Return (amount, percent) of the worst drawdown from the running bankroll peak."""
+        history = np.asarray(self.bankroll_history, dtype=float)
+        if history.size == 0:
+            return 0, 0.0
+        
+        peaks = np.maximum(np.maximum.accumulate(history), self.initial_bankroll)
+        drawdowns = peaks - history
+        drawdown_pcts = np.divide(drawdowns * 100, peaks, out=np.zeros_like(history), where=peaks > 0)
+        # Amount is reported at the worst percentage drawdown
+        worst = int(np.argmax(drawdown_pcts))
+        max_drawdown = float(drawdowns[worst]) if drawdown_pcts[worst] > 0 else 0
+        return max_drawdown, float(drawdown_pcts[worst])
+    
     def generate_report(self) -> Dict:
         """Generate comprehensive backtest report."""
         if not self.bets_placed:
             print("No bets were placed during backtest.")
             return {}
         
-        settled_bets = [b for b in self.bets_placed if b.get('result') is not None]
-        pending_bets = [b for b in self.bets_placed if b.get('result') is None]
+        settled_bets, pending_bets = self._partition_bets()
         
         total_bets = len(settled_bets)
         pending_count = len(pending_bets)
@@ -608,34 +768,32 @@ class HistoricalBacktester:
                 print(f"All {pending_count} bets are pending.")
             return {}
         
-        won_bets = sum(1 for b in settled_bets if b.get('result') == 'won')
-        lost_bets = sum(1 for b in settled_bets if b.get('result') == 'lost')
+        # One structured array for all headline aggregates
+        stats = np.fromiter(
+            ((b['stake'], b.get('actual_profit', 0), b['odds'], b['ev'],
+              b['true_probability'], b.get('result') == 'won', b.get('result') == 'lost')
+             for b in settled_bets),
+            dtype=[('stake', 'f8'), ('profit', 'f8'), ('odds', 'f8'), ('ev', 'f8'),
+                   ('prob', 'f8'), ('won', '?'), ('lost', '?')],
+            count=total_bets
+        )
+        
+        won_bets = int(stats['won'].sum())
+        lost_bets = int(stats['lost'].sum())
         
-        total_staked = sum(b['stake'] for b in settled_bets)
-        total_profit = sum(b.get('actual_profit', 0) for b in settled_bets)
+        total_staked = float(stats['stake'].sum())
+        total_profit = float(stats['profit'].sum())
         
         final_bankroll = self.current_bankroll
         total_return = (final_bankroll - self.initial_bankroll) / self.initial_bankroll * 100
         roi = (total_profit / total_staked * 100) if total_staked > 0 else 0
         
-        # Calculate max drawdown
-        peak = self.initial_bankroll
-        max_drawdown = 0
-        max_drawdown_pct = 0
-        
-        for br in self.bankroll_history:
-            if br > peak:
-                peak = br
-            drawdown = peak - br
-            drawdown_pct = (drawdown / peak * 100) if peak > 0 else 0
-            if drawdown_pct > max_drawdown_pct:
-                max_drawdown = drawdown
-                max_drawdown_pct = drawdown_pct
+        max_drawdown, max_drawdown_pct = self._max_drawdown()
         
         # Stats
-        avg_ev = sum(b['ev'] for b in settled_bets) / total_bets
-        avg_odds = sum(b['odds'] for b in settled_bets) / total_bets
-        avg_prob = sum(b['true_probability'] for b in settled_bets) / total_bets
+        avg_ev = float(stats['ev'].mean())
+        avg_odds = float(stats['odds'].mean())
+        avg_prob = float(stats['prob'].mean())
         
         # Print report
         print(f"BACKTEST RESULTS")
@@ -663,20 +821,28 @@ class HistoricalBacktester:
         print(f"  Avg True Probability: {avg_prob*100:.1f}%")
         print(f"  Avg EV: {avg_ev*100:.2f}%")
         
+        selection = 'highest EV per outcome' if self.best_ev_per_outcome else 'first found per outcome'
+        print(f"  Bet Selection: {selection}")
+        
         print(f"\nRisk Metrics:")
         print(f"  Max Drawdown: £{max_drawdown:.2f} ({max_drawdown_pct:.2f}%)")
         
         print(f"\n💾 Bets logged to data/backtest_bet_history.csv")
         
-        # Per-sport breakdown
-        sports_in_bets = set(b.get('sport') for b in settled_bets if b.get('sport'))
-        if len(sports_in_bets) > 1:
+        # Per-sport breakdown: [bets, won, profit] accumulated in one pass
+        sport_totals = {}
+        for b in settled_bets:
+            sport = b.get('sport')
+            if not sport:
+                continue
+            totals = sport_totals.setdefault(sport, [0, 0, 0.0])
+            totals[0] += 1
+            totals[1] += b.get('result') == 'won'
+            totals[2] += b.get('actual_profit', 0)
+        if len(sport_totals) > 1:
             print(f"\nPer-Sport Breakdown:")
-            for sport in sorted(sports_in_bets):
-                sport_bets = [b for b in settled_bets if b.get('sport') == sport]
-                sport_count = len(sport_bets)
-                sport_won = sum(1 for b in sport_bets if b.get('result') == 'won')
-                sport_profit = sum(b.get('actual_profit', 0) for b in sport_bets)
+            for sport in sorted(sport_totals):
+                sport_count, sport_won, sport_profit = sport_totals[sport]
                 print(f"  {sport}: {sport_count} bets, {sport_won}W-{sport_count-sport_won}L, £{sport_profit:+.2f}")
         
         print(f"\n{'='*80}\n")
@@ -698,6 +864,7 @@ class HistoricalBacktester:
             'avg_ev': avg_ev,
             'max_drawdown': max_drawdown,
             'max_drawdown_pct': max_drawdown_pct,
+            'best_ev_per_outcome': self.best_ev_per_outcome,
             'bankroll_history': self.bankroll_history,
             'bets': settled_bets,
             'pending_bets_list': pending_bets
@@ -220,11 +220,14 @@ class BetSettler:
             espn_home_lower = espn_home.lower() if espn_home else ""
             espn_away_lower = espn_away.lower() if espn_away else ""
             
-            # Determine which team was bet on
+            # Determine which team was bet on (a missing ESPN name is "", which
+            # would otherwise match every outcome)
             bet_on_home = (outcome_lower in home_lower or home_lower in outcome_lower or
-                          outcome_lower in espn_home_lower or espn_home_lower in outcome_lower)
+                          (espn_home_lower != "" and
+                           (outcome_lower in espn_home_lower or espn_home_lower in outcome_lower)))
             bet_on_away = (outcome_lower in away_lower or away_lower in outcome_lower or
-                          outcome_lower in espn_away_lower or espn_away_lower in outcome_lower)
+                          (espn_away_lower != "" and
+                           (outcome_lower in espn_away_lower or espn_away_lower in outcome_lower)))
             
             # Check if bet won
             if bet_on_home and home_score > away_score:
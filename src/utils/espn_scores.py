@@ -6,11 +6,12 @@ Falls back to SerpAPI for sports not covered by ESPN.
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 from datetime import datetime, timezone
 from typing import Optional, Dict, List, Tuple
-import time
 from pathlib import Path
 import json
+from src.utils.rate_limiter import RateLimiter
 
 
 class ESPNScoresFetcher:
@@ -148,9 +149,13 @@ class ESPNScoresFetcher:
         self.base_url = "https://site.api.espn.com/apis/site/v2/sports"
         self.serpapi_fallback = serpapi_fallback
         
+        # Keep-alive session shared by the result prefetch threads
+        self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=20))
+        
         # Rate limiting for ESPN API
-        self.last_request_time = 0
         self.min_request_interval = 0.05  # 20 requests per second max (conservative)
+        self._rate_limiter = RateLimiter(min_interval=self.min_request_interval)
         
         # Statistics
         self.stats = {
@@ -166,6 +171,9 @@ class ESPNScoresFetcher:
         # Create cache directory
         self.stats['cache_dir'].mkdir(exist_ok=True, parents=True)
         
+        # Scoreboards already loaded this run, keyed by (sport_league, date)
+        self._scoreboards = {}
+        
     def _get_cache_path(self, sport: str, date: str) -> Path:
         """Get cache file path for a sport/date combination."""
         cache_key = f"{sport}_{date}.json"
@@ -176,8 +184,7 @@ class ESPNScoresFetcher:
         cache_path = self._get_cache_path(sport, date)
         if cache_path.exists():
             try:
-                with open(cache_path, 'r') as f:
-                    return json.load(f)
+                return json.loads(cache_path.read_bytes())
             except:
                 pass
         return None
@@ -186,17 +193,42 @@ class ESPNScoresFetcher:
         """Save ESPN response to cache."""
         cache_path = self._get_cache_path(sport, date)
         try:
-            with open(cache_path, 'w') as f:
-                json.dump(data, f)
+            cache_path.write_text(json.dumps(data, separators=(',', ':')))
         except Exception as e:
             print(f"   ⚠️  Cache save error: {e}")
     
+    @staticmethod
+    def _slim_scoreboard(data: Dict) -> Dict:
+        """
+        Reduce an ESPN scoreboard response to what _parse_espn_result reads.
+        Only completed events are kept, each with its status and the two
+        competitors' name, score and home/away flag.
+        """
+        events = []
+        for event in data.get('events', []):
+            if event.get('status', {}).get('type', {}).get('completed') != True:
+                continue
+            competitions = event.get('competitions', [])
+            if not competitions:
+                continue
+            events.append({
+                'status': {'type': {'completed': True}},
+                'competitions': [{
+                    'competitors': [
+                        {
+                            'team': {'displayName': c.get('team', {}).get('displayName', '')},
+                            'score': c.get('score', 0),
+                            'homeAway': c.get('homeAway')
+                        }
+                        for c in competitions[0].get('competitors', [])
+                    ]
+                }]
+            })
+        return {'events': events}
+    
     def _rate_limit(self):
         """Enforce rate limiting between ESPN API requests."""
-        elapsed = time.time() - self.last_request_time
-        if elapsed < self.min_request_interval:
-            time.sleep(self.min_request_interval - elapsed)
-        self.last_request_time = time.time()
+        self._rate_limiter.acquire()
     
     def _fetch_espn_scores(self, sport: str, league: str, date: str) -> Optional[Dict]:
         """
@@ -210,10 +242,13 @@ class ESPNScoresFetcher:
         Returns:
             Dict with game data or None if failed
         """
-        # Check cache first
+        # Check memory, then disk cache
         cache_key = f"{sport}_{league}"
-        cached = self._load_from_cache(cache_key, date)
+        cached = self._scoreboards.get((cache_key, date))
+        if cached is None:
+            cached = self._load_from_cache(cache_key, date)
         if cached:
+            self._scoreboards[(cache_key, date)] = cached
             return cached
         
         url = f"{self.base_url}/{sport}/{league}/scoreboard"
@@ -222,14 +257,17 @@ class ESPNScoresFetcher:
         try:
             self._rate_limit()  # Apply rate limiting
             self.stats['espn_requests'] += 1
-            response = requests.get(url, params=params, timeout=10)
+            response = self.session.get(url, params=params, timeout=10)
             response.raise_for_status()
             
-            data = response.json()
+            # Keep only the fields used for settlement (the full scoreboard
+            # is mostly media, odds and venue data)
+            data = self._slim_scoreboard(response.json())
             self.stats['espn_successes'] += 1
             
             # Cache the response
             self._save_to_cache(cache_key, date, data)
+            self._scoreboards[(cache_key, date)] = data
             
             return data
         except Exception as e:
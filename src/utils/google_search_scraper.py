@@ -6,14 +6,16 @@ This module provides a clean interface to SerpAPI's Google Sports Results API
 for looking up historical sports game results.
 """
 
+import hashlib
 import os
 import requests
+from requests.adapters import HTTPAdapter
 import re
 from typing import Optional, Tuple, Dict, List
 from datetime import datetime
-import time
 from pathlib import Path
 import json
+from src.utils.rate_limiter import RateLimiter
 
 
 class GoogleSearchScraper:
@@ -43,9 +45,13 @@ class GoogleSearchScraper:
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(parents=True, exist_ok=True)
         
+        # Keep-alive session shared by the result prefetch threads
+        self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=20))
+        
         # Rate limiting
-        self.last_request_time = 0
         self.min_request_interval = 0.1  # 10 requests per second max
+        self._rate_limiter = RateLimiter(min_interval=self.min_request_interval)
         
         # Statistics
         self.stats = {
@@ -58,7 +64,6 @@ class GoogleSearchScraper:
     
     def _get_cache_key(self, query: str) -> str:
         """Generate cache key for a search query."""
-        import hashlib
         return hashlib.md5(query.encode()).hexdigest()
     
     def _get_game_cache_key(self, away_team: str, home_team: str, game_date: str) -> str:
@@ -74,8 +79,6 @@ class GoogleSearchScraper:
         Returns:
             MD5 hash of normalized game identifier
         """
-        import hashlib
-        
         # Normalize date to YYYY-MM-DD format
         try:
             if 'T' in game_date or 'Z' in game_date:
@@ -106,8 +109,7 @@ class GoogleSearchScraper:
         cache_file = self.cache_dir / f"{cache_key}.json"
         if cache_file.exists():
             try:
-                with open(cache_file, 'r') as f:
-                    return json.load(f)
+                return json.loads(cache_file.read_bytes())
             except Exception:
                 return None
         return None
@@ -116,17 +118,13 @@ class GoogleSearchScraper:
         """Save search result to cache."""
         cache_file = self.cache_dir / f"{cache_key}.json"
         try:
-            with open(cache_file, 'w') as f:
-                json.dump(data, f, indent=2)
+            cache_file.write_text(json.dumps(data, separators=(',', ':')))
         except Exception as e:
             print(f"Warning: Failed to save to cache: {e}")
     
     def _rate_limit(self):
         """Enforce rate limiting between API requests."""
-        elapsed = time.time() - self.last_request_time
-        if elapsed < self.min_request_interval:
-            time.sleep(self.min_request_interval - elapsed)
-        self.last_request_time = time.time()
+        self._rate_limiter.acquire()
     
     def search_sports_score(self, query: str, use_cache: bool = True) -> Optional[Dict]:
         """
@@ -161,7 +159,7 @@ class GoogleSearchScraper:
         }
         
         try:
-            response = requests.get(self.base_url, params=params, timeout=15)
+            response = self.session.get(self.base_url, params=params, timeout=15)
             response.raise_for_status()
             
             result = response.json()
@@ -5,6 +5,7 @@ Utility functions for odds calculations and conversions.
 """
 
 from fractions import Fraction
+from functools import lru_cache
 
 
 def calculate_implied_probability(decimal_odds: float) -> float:
@@ -20,10 +21,14 @@ def calculate_implied_probability(decimal_odds: float) -> float:
     return 1 / decimal_odds
 
 
+@lru_cache(maxsize=4096)
 def decimal_to_fractional(decimal_odds: float) -> str:
     """
     Convert decimal odds to fractional format.
     
+    Pure function, memoized: the same handful of prices (2.00, 1.91, ...)
+    are converted many times per scan.
+    
     Args:
         decimal_odds: Odds in decimal format (e.g., 3.50)
         
@@ -0,0 +1,169 @@
+"""
+Rate Limiter Module
+
+Thread-safe request throttling shared by the API clients.
+Combines a minimum interval between requests with an optional
+sliding-window cap on requests per minute.
+"""
+
+import threading
+import time
+from collections import deque
+
+
+class RateLimiter:
+    """
+    Throttle outbound requests.
+
+    Two limits are enforced, whichever is stricter:
+      - min_interval: minimum seconds between consecutive requests
+      - max_per_minute: maximum requests in any sliding 60 second window
+    """
+
+    def __init__(self, min_interval: float = 0.0, max_per_minute: int = 0,
+                 window: float = 60.0):
+        """
+        Initialize the rate limiter.
+
+        Args:
+            min_interval: Minimum seconds between requests (0 = no limit)
+            max_per_minute: Maximum requests per window (0 = no limit)
+            window: Length of the sliding window in seconds
+        """
+        self.min_interval = min_interval
+        self.max_per_minute = max_per_minute
+        self.window = window
+
+        self._last_request_time = 0.0
+        self._request_times = deque()
+        self._lock = threading.Lock()
+
+    def _wait_time(self, now: float) -> float:
+        """Seconds to wait before a request may be sent at time `now`."""
+        wait = 0.0
+
+        if self.min_interval > 0:
+            wait = max(wait, self._last_request_time + self.min_interval - now)
+
+        if self.max_per_minute > 0:
+            # Drop requests that have left the window
+            while self._request_times and now - self._request_times[0] >= self.window:
+                self._request_times.popleft()
+            # Times may include slots reserved in the future; the request
+            # max_per_minute places back must leave the window first
+            if len(self._request_times) >= self.max_per_minute:
+                wait = max(wait, self._request_times[-self.max_per_minute] + self.window - now)
+
+        return wait
+
+    def acquire(self):
+        """
+        Block until a request is allowed, then record it.
+
+        The request's slot is reserved under the lock but waited for outside
+        it, so concurrent callers queue for successive slots instead of
+        sleeping one at a time while holding the lock.
+        """
+        with self._lock:
+            now = time.monotonic()
+            slot = now + self._wait_time(now)
+            self._last_request_time = slot
+            if self.max_per_minute > 0:
+                self._request_times.append(slot)
+
+        wait = slot - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Concurrency limit that adapts to the API's observed capacity (AIMD).
+
+    Every `window` successful requests, the limit grows by one if the mean
+    latency stayed within `target_latency`, otherwise it is multiplied by
+    `decrease_factor`. A failed request (429, 5xx, timeout) shrinks the
+    limit immediately, unless it was started before the last decrease - a
+    burst of concurrent failures is one congestion signal, not many. The
+    limit is kept within [min_limit, max_limit].
+    """
+
+    def __init__(self, initial_limit: int, min_limit: int = 1,
+                 max_limit: int = None, target_latency: float = 2.0,
+                 window: int = 20, decrease_factor: float = 0.5):
+        """
+        Initialize the limiter.
+
+        Args:
+            initial_limit: Starting number of concurrent requests
+            min_limit: Lower bound for the limit
+            max_limit: Upper bound for the limit (defaults to initial_limit)
+            target_latency: Mean latency in seconds considered healthy
+            window: Number of samples between additive increases
+            decrease_factor: Multiplier applied to the limit on congestion
+        """
+        self.min_limit = min_limit
+        self.max_limit = max_limit or initial_limit
+        self.limit = max(min_limit, min(initial_limit, self.max_limit))
+        self.target_latency = target_latency
+        self.window = window
+        self.decrease_factor = decrease_factor
+
+        self._in_flight = 0
+        self._latencies = []
+        self._last_decrease = float('-inf')
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        """Block until a request slot is free under the current limit."""
+        with self._condition:
+            while self._in_flight >= self.limit:
+                self._condition.wait()
+            self._in_flight += 1
+
+    def release(self):
+        """Return a request slot."""
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+        return False
+
+    def _decrease(self):
+        self.limit = max(self.min_limit, int(self.limit * self.decrease_factor))
+        self._latencies = []
+        self._last_decrease = time.monotonic()
+
+    def record(self, latency: float, success: bool = True):
+        """
+        Record the outcome of a request and adjust the limit.
+
+        Args:
+            latency: Request duration in seconds
+            success: False if the request was throttled or failed
+        """
+        with self._condition:
+            if not success:
+                # Requests started before the last cut were sent under the
+                # old limit and have already been accounted for
+                if time.monotonic() - latency >= self._last_decrease:
+                    self._decrease()
+                return
+
+            self._latencies.append(latency)
+            if len(self._latencies) < self.window:
+                return
+
+            mean_latency = sum(self._latencies) / len(self._latencies)
+            if mean_latency <= self.target_latency:
+                self.limit = min(self.max_limit, self.limit + 1)
+                self._latencies = []
+                self._condition.notify_all()
+            else:
+                self._decrease()
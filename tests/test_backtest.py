@@ -5,9 +5,10 @@ Unit tests for Historical Backtest module
 import pytest
 import json
 import tempfile
+import requests
 from pathlib import Path
 from unittest.mock import Mock, patch, MagicMock
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from src.utils.backtest import HistoricalBacktester
 
 
@@ -80,6 +81,20 @@ class TestCaching:
         # Verify the cached session exists and is a CachedSession
         assert isinstance(cached_session, requests_cache.CachedSession)
     
+    def test_cached_session_pools_connections(self):
+        """Test the cached session reuses pooled connections and retries throttling"""
+        from src.utils.backtest import cached_session
+        adapter = cached_session.get_adapter('https://api.the-odds-api.com')
+        assert adapter._pool_maxsize == 16
+        assert 429 in adapter.max_retries.status_forcelist
+    
+    def test_cache_uses_wal_journal(self):
+        """Test the sqlite cache runs in WAL mode"""
+        from src.utils.backtest import cached_session
+        with cached_session.cache.responses.connection() as con:
+            mode = con.execute('PRAGMA journal_mode').fetchone()[0]
+        assert mode.lower() == 'wal'
+    
     @patch('src.utils.backtest.cached_session.get')
     def test_http_caching_works(self, mock_get, backtester):
         """Test that HTTP requests are being cached"""
@@ -100,6 +115,194 @@ class TestCaching:
         assert result1 == result2
         # cached_session.get should be called
         assert mock_get.call_count >= 1
+    
+    @patch('src.utils.backtest.cached_session.get')
+    def test_cache_hits_skip_rate_limiter(self, mock_get, backtester):
+        """Test only cache misses wait on the rate limiter"""
+        hit = Mock(status_code=200)
+        mock_get.return_value = hit
+        with patch.object(backtester._rate_limiter, 'acquire') as mock_acquire:
+            assert backtester._get_odds_response('https://example.com', {}) is hit
+        mock_acquire.assert_not_called()
+        assert mock_get.call_args.kwargs['only_if_cached'] is True
+    
+    @patch('src.utils.backtest.cached_session.get')
+    def test_cache_miss_is_rate_limited(self, mock_get, backtester):
+        """Test a cache miss acquires the rate limiter before fetching"""
+        fetched = Mock(status_code=200)
+        mock_get.side_effect = [Mock(status_code=504), fetched]
+        with patch.object(backtester._rate_limiter, 'acquire') as mock_acquire:
+            assert backtester._get_odds_response('https://example.com', {}) is fetched
+        mock_acquire.assert_called_once()
+        assert 'only_if_cached' not in mock_get.call_args.kwargs
+    
+    def test_historical_odds_memoized_across_runs(self, backtester):
+        """Test a snapshot is only fetched once per backtester"""
+        with patch.object(backtester, '_fetch_markets_individually', return_value={'data': [{'id': 'g1'}]}) as mock_fetch:
+            first = backtester.get_historical_odds('soccer_epl', '2024-01-01T12:00:00Z')
+            backtester.reset_state()
+            second = backtester.get_historical_odds('soccer_epl', '2024-01-01T12:00:00Z')
+        
+        assert first == second == {'data': [{'id': 'g1'}]}
+        mock_fetch.assert_called_once()
+    
+    def test_historical_odds_memo_is_bounded(self, backtester):
+        """Test the oldest snapshot is evicted once the memo is full"""
+        backtester._odds_memo_size = 2
+        with patch.object(backtester, '_fetch_markets_individually', return_value=None):
+            for day in ('01', '02', '03'):
+                backtester.get_historical_odds('soccer_epl', f'2024-01-{day}T00:00:00Z')
+        
+        assert [key[1] for key in backtester._odds_memo] == ['2024-01-02T00:00:00Z', '2024-01-03T00:00:00Z']
+
+    
+    def test_historical_odds_memo_covers_whole_run(self, backtester):
+        """Test a repeated run longer than the default memo bound is served from memory"""
+        with patch.object(backtester, '_fetch_markets_individually', return_value={'data': []}) as mock_fetch, \
+             patch.object(backtester.espn_scraper, 'print_stats'):
+            # 12 days of hourly snapshots = 265 lookups, above the default 256
+            backtester.backtest(['soccer_epl'], '2024-01-01', '2024-01-12', snapshot_interval_hours=1)
+            assert mock_fetch.call_count == 265
+            mock_fetch.reset_mock()
+            
+            backtester.backtest(['soccer_epl'], '2024-01-01', '2024-01-12', snapshot_interval_hours=1)
+        
+        mock_fetch.assert_not_called()
+
+class TestFetchMarkets:
+    """Test the per-market fetch and merge"""
+    
+    def test_merges_markets_in_market_order(self, backtester):
+        """Test markets fetched one at a time are merged per game and bookmaker in market order"""
+        backtester._market_list = ['h2h', 'totals']
+        market_data = {
+            'h2h': {'data': [{'id': 'g1', 'bookmakers': [{'key': 'bet365', 'markets': [{'key': 'h2h'}]}]}]},
+            'totals': {'data': [
+                {'id': 'g1', 'bookmakers': [
+                    {'key': 'bet365', 'markets': [{'key': 'totals'}]},
+                    {'key': 'pinnacle', 'markets': [{'key': 'totals'}]},
+                ]},
+                {'id': 'g2', 'bookmakers': []},
+            ]},
+        }
+        def get_response(url, params):
+            response = Mock()
+            response.json.return_value = market_data[params['markets']]
+            return response
+        
+        with patch.object(backtester, '_get_odds_response', side_effect=get_response) as mock_get:
+            combined = backtester._fetch_markets_individually('https://example.com', {'markets': 'h2h,totals'})
+        
+        assert [c.args[1]['markets'] for c in mock_get.call_args_list] == ['h2h', 'totals']
+        assert [g['id'] for g in combined['data']] == ['g1', 'g2']
+        bookmakers = {b['key']: [m['key'] for m in b['markets']] for b in combined['data'][0]['bookmakers']}
+        assert bookmakers == {'bet365': ['h2h', 'totals'], 'pinnacle': ['totals']}
+    
+    def test_failed_markets_are_skipped(self, backtester):
+        """Test a market that fails does not drop the others"""
+        backtester._market_list = ['h2h', 'totals']
+        def get_response(url, params):
+            if params['markets'] == 'h2h':
+                raise requests.exceptions.Timeout('timed out')
+            response = Mock()
+            response.json.return_value = {'data': [{'id': 'g1'}]}
+            return response
+        
+        with patch.object(backtester, '_get_odds_response', side_effect=get_response):
+            combined = backtester._fetch_markets_individually('https://example.com', {})
+        
+        assert combined == {'data': [{'id': 'g1'}]}
+
+
+class TestBacktestLoop:
+    """Test the snapshot loop"""
+    
+    def test_fetches_every_snapshot_in_order(self, backtester):
+        """Test prefetched odds are consumed in snapshot/sport order"""
+        with patch.object(backtester, 'get_historical_odds', return_value=None) as mock_odds, \
+             patch.object(backtester.espn_scraper, 'print_stats'):
+            backtester.backtest(['soccer_epl', 'basketball_nba'], '2024-01-01', '2024-01-02',
+                                snapshot_interval_hours=12)
+        
+        calls = sorted(c.args for c in mock_odds.call_args_list)
+        assert calls == sorted([
+            (sport, ts)
+            for ts in ['2024-01-01T00:00:00Z', '2024-01-01T12:00:00Z', '2024-01-02T00:00:00Z']
+            for sport in ['soccer_epl', 'basketball_nba']
+        ])
+    
+    @pytest.mark.parametrize('best_ev, expected_bookmaker', [(True, 'williamhill'), (False, 'bet365')])
+    def test_bets_one_opportunity_per_outcome(self, backtester, best_ev, expected_bookmaker):
+        """Test one opportunity per outcome is bet - the highest EV only when enabled"""
+        backtester.best_ev_per_outcome = best_ev
+        opps = [
+            {'game': 'A @ B', 'market': 'h2h', 'outcome': 'B', 'ev': 0.04, 'bookmaker': 'bet365'},
+            {'game': 'A @ B', 'market': 'h2h', 'outcome': 'B', 'ev': 0.07, 'bookmaker': 'williamhill'},
+            {'game': 'A @ B', 'market': 'totals', 'outcome': 'Over', 'ev': 0.05, 'bookmaker': 'bet365'},
+        ]
+        with patch.object(backtester, 'get_historical_odds', return_value={'data': [{}]}), \
+             patch.object(backtester, 'find_positive_ev_bets', side_effect=[opps, []]), \
+             patch.object(backtester, 'place_bet') as mock_place, \
+             patch.object(backtester.espn_scraper, 'print_stats'):
+            backtester.backtest(['soccer_epl'], '2024-01-01', '2024-01-01',
+                                snapshot_interval_hours=12)
+        
+        placed = [c.args[0] for c in mock_place.call_args_list]
+        assert [(p['outcome'], p['bookmaker']) for p in placed] == [('B', expected_bookmaker), ('Over', 'bet365')]
+    
+    def test_iter_historical_odds_preserves_order(self, backtester):
+        """Test results come back in job order regardless of completion order"""
+        backtester.max_fetch_workers = 2
+        jobs = [('soccer_epl', f'2024-01-0{i}T00:00:00Z') for i in range(1, 6)]
+        with patch.object(backtester, 'get_historical_odds', side_effect=lambda sport, date: {'date': date}):
+            results = list(backtester._iter_historical_odds(jobs))
+        
+        assert [job for job, _ in results] == jobs
+        assert [data['date'] for _, data in results] == [date for _, date in jobs]
+    
+    def test_iter_historical_odds_close_cancels_queued_fetches(self, backtester):
+        """Test closing the stream early cancels fetches that haven't started"""
+        import threading
+        backtester.max_fetch_workers = 1
+        jobs = [('soccer_epl', f'2024-01-0{i}T00:00:00Z') for i in range(1, 6)]
+        release = threading.Event()
+        fetched = []
+        
+        def fetch(sport, date):
+            fetched.append(date)
+            if len(fetched) == 2:
+                release.wait(5)
+            return {'date': date}
+        
+        with patch.object(backtester, 'get_historical_odds', side_effect=fetch):
+            stream = backtester._iter_historical_odds(jobs)
+            next(stream)
+            threading.Timer(0.1, release.set).start()
+            stream.close()
+        
+        assert fetched == [jobs[0][1], jobs[1][1]]
+
+
+class TestParseTimestamp:
+    """Test timestamp parsing"""
+    
+    @pytest.mark.parametrize('ts, expected', [
+        ('2024-01-05T19:30:00Z', datetime(2024, 1, 5, 19, 30, tzinfo=timezone.utc)),
+        ('2024-01-05T19:30:00.500Z', datetime(2024, 1, 5, 19, 30, 0, 500000, tzinfo=timezone.utc)),
+        ('2024-01-05 19:30 UTC', datetime(2024, 1, 5, 19, 30, tzinfo=timezone.utc)),
+        ('2024-01-05T19:30:00+01:00', datetime(2024, 1, 5, 18, 30, tzinfo=timezone.utc)),
+        ('2024-01-05 19:30:00', datetime(2024, 1, 5, 19, 30, tzinfo=timezone.utc)),
+    ])
+    def test_parse_timestamp_formats(self, backtester, ts, expected):
+        """Test every supported layout parses to the same aware datetime"""
+        parsed = backtester._parse_timestamp(ts)
+        assert parsed == expected
+        assert parsed.tzinfo is not None
+    
+    def test_parse_timestamp_is_cached(self, backtester):
+        """Test repeated timestamps are parsed once"""
+        first = backtester._parse_timestamp('2024-02-01T20:00:00Z')
+        assert backtester._parse_timestamp('2024-02-01T20:00:00Z') is first
 
 
 class TestCalculations:
@@ -233,6 +436,15 @@ class TestFindPositiveEVBets:
         
         # Should find at least one opportunity
         assert isinstance(opportunities, list)
+    
+    def test_find_positive_ev_bets_uses_current_initial_bankroll(self, backtester):
+        """Test stakes are sized off initial_bankroll even when set after construction"""
+        backtester.initial_bankroll = 500.0
+        
+        with patch.object(backtester.scanner, 'analyze_games_for_ev', return_value=[]):
+            backtester.find_positive_ev_bets({'data': [{}]}, 'soccer_epl')
+        
+        assert backtester.scanner.kelly.bankroll == 500.0
 
 
 class TestDetermineBetResult:
@@ -316,6 +528,50 @@ class TestDetermineBetResult:
         result = backtester.determine_bet_result(bet, {})
         assert result == 'lost'
     
+    def test_determine_bet_result_uses_prefetched_result_by_game_id(self, backtester):
+        """Test prefetched results are looked up by the API game id"""
+        bet = {
+            'game_id': 'abc123',
+            'game': 'Chelsea @ Arsenal',
+            'sport': 'soccer_epl',
+            'market': 'h2h',
+            'outcome': 'Arsenal',
+            'commence_time': '2024-01-01T15:00:00Z'
+        }
+        backtester.game_results_cache['abc123'] = {
+            'home_team': 'Arsenal', 'away_team': 'Chelsea',
+            'home_score': 2, 'away_score': 1, 'completed': True
+        }
+        
+        with patch.object(backtester.espn_scraper, 'get_game_result') as mock_fetch:
+            result = backtester.determine_bet_result(bet)
+        
+        assert result == 'won'
+        mock_fetch.assert_not_called()
+    
+    def test_determine_bet_result_matches_espn_team_name(self):
+        """Test h2h side detection also matches ESPN's team name"""
+        from src.utils.bet_settler import BetSettler
+        
+        bet = {'market': 'h2h', 'outcome': 'LA Clippers'}
+        
+        result = BetSettler.determine_bet_result_backtest(
+            bet, 'Los Angeles Clippers', 'Boston Celtics', 110, 100,
+            espn_home='LA Clippers', espn_away='Boston Celtics'
+        )
+        assert result == 'won'
+    
+    def test_determine_bet_result_without_espn_names(self):
+        """Test a missing ESPN name does not match every outcome"""
+        from src.utils.bet_settler import BetSettler
+        
+        bet = {'market': 'h2h', 'outcome': 'Chelsea'}
+        
+        result = BetSettler.determine_bet_result_backtest(
+            bet, 'Arsenal', 'Chelsea', 2, 1
+        )
+        assert result == 'lost'
+    
     def test_determine_bet_result_game_not_found(self, backtester):
         """Test with game not in scores data"""
         bet = {
@@ -328,6 +584,24 @@ class TestDetermineBetResult:
         assert result is None
 
 
+class TestPartitionBets:
+    """Test splitting placed bets into settled and pending"""
+    
+    def test_partition_bets(self, backtester):
+        """Test bets are split by whether they have a result, keeping order"""
+        backtester.bets_placed = [
+            {'id': 1, 'result': 'won'},
+            {'id': 2, 'result': None},
+            {'id': 3, 'result': 'lost'},
+            {'id': 4},
+        ]
+        
+        settled, pending = backtester._partition_bets()
+        
+        assert [b['id'] for b in settled] == [1, 3]
+        assert [b['id'] for b in pending] == [2, 4]
+
+
 class TestGenerateReport:
     """Test report generation"""
     
@@ -359,6 +633,62 @@ class TestGenerateReport:
         assert 'final_bankroll' in report
         assert 'total_return_pct' in report
         assert 'roi' in report
+    
+    def test_generate_report_headline_stats(self, backtester):
+        """Test aggregate stats are plain numbers with the expected values"""
+        for i, (odds, ev, result) in enumerate([(2.0, 0.04, 'won'), (3.0, 0.08, 'lost')]):
+            bet = {
+                'stake': 10,
+                'odds': odds,
+                'ev': ev,
+                'true_probability': 0.5
+            }
+            backtester.place_bet(bet, result=result, bet_timestamp=f'2024-01-0{i + 1}T12:00:00Z')
+        
+        report = backtester.generate_report()
+        
+        assert report['total_staked'] == pytest.approx(20)
+        assert report['total_profit'] == pytest.approx(0)
+        assert report['avg_odds'] == pytest.approx(2.5)
+        assert report['avg_ev'] == pytest.approx(0.06)
+        assert type(report['won_bets']) is int
+        json.dumps({k: v for k, v in report.items() if k not in ('bets', 'pending_bets_list')})
+    
+    def test_generate_report_per_sport_breakdown(self, backtester, capsys):
+        """Test per-sport totals are printed when several sports were bet"""
+        for i, (sport, result) in enumerate([('soccer_epl', 'won'), ('soccer_epl', 'lost'), ('basketball_nba', 'won')]):
+            bet = {
+                'stake': 10,
+                'odds': 2.0,
+                'sport': sport,
+                'ev': 0.05,
+                'true_probability': 0.55
+            }
+            backtester.place_bet(bet, result=result, bet_timestamp=f'2024-01-0{i + 1}T12:00:00Z')
+        
+        backtester.generate_report()
+        output = capsys.readouterr().out
+        
+        assert "basketball_nba: 1 bets, 1W-0L, £+10.00" in output
+        assert "soccer_epl: 2 bets, 1W-1L, £+0.00" in output
+    
+    def test_generate_report_max_drawdown(self, backtester):
+        """Test max drawdown is measured from the running peak"""
+        backtester.bets_placed = [{'result': 'won', 'stake': 10, 'odds': 2.0, 'ev': 0.05,
+                                   'true_probability': 0.55, 'actual_profit': 10}]
+        backtester.bankroll_history = [1000, 1200, 900, 1100, 800, 1300]
+        
+        report = backtester.generate_report()
+        
+        # Worst point is 800 against the 1200 peak
+        assert report['max_drawdown'] == pytest.approx(400)
+        assert report['max_drawdown_pct'] == pytest.approx(400 / 1200 * 100)
+    
+    def test_max_drawdown_empty_history(self, backtester):
+        """Test max drawdown is zero with no bankroll history"""
+        backtester.bankroll_history = []
+        
+        assert backtester._max_drawdown() == (0, 0.0)
 
 
 class TestEdgeCases:
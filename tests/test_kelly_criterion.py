@@ -54,6 +54,18 @@ class TestKellyCriterion:
         
         assert result['recommended_stake'] == 0
     
+    def test_full_kelly_fraction(self):
+        """Test full Kelly fraction matches the full Kelly stake percentage"""
+        kelly = KellyCriterion(bankroll=1000)
+        full = KellyCriterion.full_kelly_fraction(2.5, 0.5)
+        
+        # (1.5 * 0.5 - 0.5) / 1.5 = 1/6
+        assert full == pytest.approx(1 / 6)
+        assert full * 100 == pytest.approx(
+            kelly.calculate_kelly_stake(decimal_odds=2.5, true_probability=0.5)['kelly_percentage']
+        )
+        assert KellyCriterion.full_kelly_fraction(1.0, 0.9) == 0.0
+    
     def test_calculate_kelly_stake_half_kelly(self):
         """Test Kelly calculation with half Kelly fraction"""
         # Use a Kelly instance with no rounding to test the relationship
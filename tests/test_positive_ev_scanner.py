@@ -357,12 +357,59 @@ class TestFilterOneBetPerGame:
             filtered = scanner.filter_one_bet_per_game(opps)
             
             assert len(filtered) == 2
+    
+    def test_filter_one_bet_per_game_normalizes_keys(self, scanner):
+        """Test outcomes differing only in case or spacing count as one"""
+        scanner.one_bet_per_outcome = True
+        opps = [
+            {'game': 'Arsenal @ Chelsea', 'market': 'h2h', 'outcome': 'Arsenal', 'ev_percentage': 5.0},
+            {'game': 'arsenal  @ Chelsea', 'market': 'H2H', 'outcome': 'Arsenal ', 'ev_percentage': 3.0}
+        ]
+        
+        filtered = scanner.filter_one_bet_per_game(opps)
+        
+        assert filtered == [opps[0]]
+    
+    def test_already_bet_filter_normalizes_keys(self, scanner):
+        """Test bet history keys match regardless of case or spacing"""
+        with patch.object(scanner.bet_repository, 'get_already_bet_outcomes',
+                          return_value={('ARSENAL @ CHELSEA', 'h2h', ' arsenal')}):
+            already_bet, _ = scanner._get_bet_history_filters()
+        
+        assert scanner._outcome_key('Arsenal @ Chelsea', 'h2h', 'Arsenal') in already_bet
+    
+    def test_best_per_game_matches_sort_then_filter(self, scanner):
+        """Test best_per_game keeps the best bet per outcome, sorted"""
+        from operator import itemgetter
+        opps = [
+            {'game': 'Arsenal @ Chelsea', 'market': 'h2h', 'outcome': 'Arsenal', 'ev_percentage': 3.0},
+            {'game': 'Liverpool @ Man Utd', 'market': 'h2h', 'outcome': 'Liverpool', 'ev_percentage': 4.0},
+            {'game': 'Arsenal @ Chelsea', 'market': 'h2h', 'outcome': 'Arsenal', 'ev_percentage': 5.0},
+            {'game': 'Arsenal @ Chelsea', 'market': 'totals', 'outcome': 'Over 2.5', 'ev_percentage': 4.5}
+        ]
+        
+        best = scanner.best_per_game(opps, itemgetter('ev_percentage'), reverse=True)
+        
+        assert [o['ev_percentage'] for o in best] == [5.0, 4.5, 4.0]
+        assert scanner.get_filter_stats()['filtered_one_per_game'] == 1
+    
+    def test_best_per_game_ascending(self, scanner):
+        """Test best_per_game keeps the lowest value when sorting ascending"""
+        from operator import itemgetter
+        opps = [
+            {'game': 'A @ B', 'market': 'h2h', 'outcome': 'A', 'odds': 2.5},
+            {'game': 'A @ B', 'market': 'h2h', 'outcome': 'A', 'odds': 2.1}
+        ]
+        
+        best = scanner.best_per_game(opps, itemgetter('odds'), reverse=False)
+        
+        assert best == [opps[1]]
 
 
 class TestGetOdds:
     """Test get_odds API call"""
     
-    @patch('src.core.positive_ev_scanner.requests.get')
+    @patch('src.core.positive_ev_scanner.requests.Session.get')
     def test_get_odds_success(self, mock_get, scanner):
         """Test successful odds retrieval"""
         mock_response = Mock()
@@ -382,7 +429,7 @@ class TestGetOdds:
         assert len(result) == 1
         assert result[0]['home_team'] == 'Arsenal'
     
-    @patch('src.core.positive_ev_scanner.requests.get')
+    @patch('src.core.positive_ev_scanner.requests.Session.get')
     def test_get_odds_api_error(self, mock_get, scanner):
         """Test handles API errors gracefully"""
         mock_get.side_effect = Exception('API Error')
@@ -390,12 +437,122 @@ class TestGetOdds:
         result = scanner.get_odds('soccer_epl')
         
         assert result == []
+    
+    @patch('src.core.positive_ev_scanner.time.sleep')
+    @patch('src.core.positive_ev_scanner.requests.Session.get')
+    def test_get_odds_retries_rate_limit(self, mock_get, mock_sleep, scanner):
+        """Test a transient 429 is retried, honoring Retry-After"""
+        throttled = Mock(status_code=429, headers={'Retry-After': '3'})
+        ok = Mock(status_code=200, headers={})
+        ok.json.return_value = [{'id': 'game1', 'home_team': 'Arsenal', 'away_team': 'Chelsea'}]
+        mock_get.side_effect = [throttled, ok]
+        
+        result = scanner.get_odds('soccer_epl')
+        
+        assert len(result) == 1
+        assert mock_get.call_count == 2
+        mock_sleep.assert_any_call(3.0)
+    
+    @patch('src.core.positive_ev_scanner.time.sleep')
+    @patch('src.core.positive_ev_scanner.requests.Session.get')
+    def test_get_odds_retries_timeout(self, mock_get, mock_sleep, scanner):
+        """Test timeouts are retried before giving up"""
+        import requests
+        mock_get.side_effect = requests.exceptions.Timeout('timed out')
+        
+        result = scanner.get_odds('soccer_epl')
+        
+        assert result == []
+        assert mock_get.call_count == 3
+    
+    @patch('src.core.positive_ev_scanner.requests.Session.get')
+    def test_get_odds_cache_ignores_market_order(self, mock_get, scanner):
+        """Test cached odds are reused regardless of market order"""
+        mock_response = Mock(status_code=200, headers={})
+        mock_response.json.return_value = [{'id': 'game1'}]
+        mock_get.return_value = mock_response
+        
+        scanner.get_odds('soccer_epl', 'h2h,totals')
+        scanner.get_odds('soccer_epl', 'totals, h2h')
+        
+        assert mock_get.call_count == 1
+    
+    @patch('src.core.positive_ev_scanner.requests.Session.get')
+    def test_invalidate_cache_forces_refresh(self, mock_get, scanner):
+        """Test invalidate_cache makes the next call hit the API"""
+        mock_response = Mock(status_code=200, headers={})
+        mock_response.json.return_value = [{'id': 'game1'}]
+        mock_get.return_value = mock_response
+        
+        scanner.get_odds('soccer_epl')
+        scanner.invalidate_cache('soccer_epl')
+        scanner.get_odds('soccer_epl')
+        
+        assert mock_get.call_count == 2
+    
+    @patch('src.core.positive_ev_scanner.requests.Session.get')
+    def test_invalidate_cache_keeps_sports_sharing_a_prefix(self, mock_get, scanner):
+        """Test invalidating a sport leaves sports whose key starts with it cached"""
+        mock_response = Mock(status_code=200, headers={})
+        mock_response.json.return_value = [{'id': 'game1'}]
+        mock_get.return_value = mock_response
+        
+        scanner.get_odds('basketball_nba')
+        scanner.get_odds('basketball_nba_championship_winner', 'outrights')
+        scanner.invalidate_cache('basketball_nba')
+        
+        assert ('basketball_nba_championship_winner', 'outrights') in scanner._odds_cache
+        assert not any(key[0] == 'basketball_nba' for key in scanner._odds_cache)
+    
+    @patch('src.core.positive_ev_scanner.requests.Session.get')
+    def test_get_odds_caches_invalid_market_fallback(self, mock_get, scanner):
+        """Test the per-market fallback result is cached under the requested markets"""
+        import requests
+        invalid = Mock(status_code=422, headers={})
+        invalid.json.return_value = {}
+        invalid.raise_for_status.side_effect = requests.exceptions.HTTPError(response=invalid)
+        ok = Mock(status_code=200, headers={})
+        ok.json.return_value = [{'id': 'game1', 'bookmakers': []}]
+        unavailable = Mock(status_code=422, headers={})
+        unavailable.raise_for_status.side_effect = requests.exceptions.HTTPError(response=unavailable)
+        mock_get.side_effect = [invalid, ok, unavailable]
+        
+        first = scanner.get_odds('soccer_epl', 'h2h,spreads')
+        second = scanner.get_odds('soccer_epl', 'h2h,spreads')
+        
+        assert first == second == [{'id': 'game1', 'bookmakers': []}]
+        assert mock_get.call_count == 3
+    
+    @patch('src.core.positive_ev_scanner.requests.Session.get')
+    def test_get_odds_merges_per_market_bookmakers(self, mock_get, scanner):
+        """Test per-market responses are merged by game and bookmaker"""
+        import requests
+        invalid = Mock(status_code=422, headers={})
+        invalid.json.return_value = {}
+        invalid.raise_for_status.side_effect = requests.exceptions.HTTPError(response=invalid)
+        h2h = Mock(status_code=200, headers={})
+        h2h.json.return_value = [{'id': 'game1', 'bookmakers': [{'key': 'pinnacle', 'markets': [{'key': 'h2h'}]}]}]
+        spreads = Mock(status_code=200, headers={})
+        spreads.json.return_value = [
+            {'id': 'game1', 'bookmakers': [
+                {'key': 'pinnacle', 'markets': [{'key': 'spreads'}]},
+                {'key': 'bet365', 'markets': [{'key': 'spreads'}]},
+            ]},
+            {'id': 'game2', 'bookmakers': []},
+        ]
+        mock_get.side_effect = [invalid, h2h, spreads]
+        
+        games = scanner.get_odds('soccer_epl', 'h2h,spreads')
+        
+        assert [g['id'] for g in games] == ['game1', 'game2']
+        bookmakers = {b['key']: [m['key'] for m in b['markets']] for b in games[0]['bookmakers']}
+        assert bookmakers == {'pinnacle': ['h2h', 'spreads'], 'bet365': ['spreads']}
 
 
 class TestGetAvailableSports:
     """Test get_available_sports API call"""
     
-    @patch('src.core.positive_ev_scanner.requests.get')
+    @patch('src.core.positive_ev_scanner.requests.Session.get')
     def test_get_available_sports_success(self, mock_get, scanner):
         """Test successful sports retrieval"""
         mock_response = Mock()
@@ -411,7 +568,7 @@ class TestGetAvailableSports:
         assert len(result) == 2
         assert result[0]['key'] == 'soccer_epl'
     
-    @patch('src.core.positive_ev_scanner.requests.get')
+    @patch('src.core.positive_ev_scanner.requests.Session.get')
     def test_get_available_sports_error(self, mock_get, scanner):
         """Test handles errors gracefully"""
         mock_get.side_effect = Exception('API Error')
@@ -538,3 +695,135 @@ class TestMaxDaysAheadFilter:
         }):
             scanner = PositiveEVScanner()
             assert scanner.max_days_ahead == 1.5
+
+
+class TestPrintOpportunities:
+    """Test buffered opportunity output"""
+    
+    def test_print_opportunities_writes_all_sections(self, scanner, sample_betting_opportunity, capsys):
+        """Test output contains header, sport block and opportunity details"""
+        opp = dict(sample_betting_opportunity, sharp_links=[
+            {'name': 'Pinnacle', 'odds': 2.3, 'link': 'https://pinnacle.com/test'}
+        ])
+        
+        scanner.print_opportunities({'soccer_epl': [opp]})
+        
+        out = capsys.readouterr().out
+        assert 'POSITIVE EV OPPORTUNITIES FOUND: 1' in out
+        assert 'SOCCER EPL: 1 opportunities' in out
+        assert '1. 🎯 Arsenal @ Chelsea' in out
+        assert 'Odds: 2.50 (3/2) | Sharp: 2.30 (13/10)' in out
+        assert '• Pinnacle: 2.30 (13/10) - https://pinnacle.com/test' in out
+    
+    def test_print_opportunities_fast_stdout(self, scanner, tmp_path):
+        """Test SCANNER_FAST_STDOUT writes straight to a redirected stdout"""
+        out_file = tmp_path / 'out.txt'
+        scanner._fast_stdout = True
+        with open(out_file, 'w', encoding='utf-8') as f, patch('sys.stdout', f):
+            scanner.print_opportunities({})
+        
+        assert 'No +EV opportunities found at this time.' in out_file.read_text(encoding='utf-8')
+    
+    def test_print_opportunities_top_n(self, scanner, capsys):
+        """Test DISPLAY_TOP_N limits output to the best opportunities"""
+        def make_opp(game, ev):
+            return {
+                'game': game, 'commence_time': '2025-01-01 15:00 UTC', 'market': 'h2h',
+                'outcome': 'Home', 'bookmaker': 'Bet365', 'odds': 2.0, 'sharp_avg_odds': 1.9,
+                'ev_percentage': ev, 'true_probability': 52.0, 'bookmaker_probability': 50.0,
+                'kelly_stake': {'recommended_stake': 10.0, 'kelly_percentage': 1.0},
+                'expected_profit': ev, 'bookmaker_url': 'https://example.com', 'sharp_links': []
+            }
+        scanner.display_top_n = 2
+        scanner.order_by = 'ev'
+        
+        scanner.print_opportunities({'soccer_epl': [make_opp('A @ B', 3.0), make_opp('C @ D', 5.0), make_opp('E @ F', 4.0)]})
+        
+        out = capsys.readouterr().out
+        assert 'Showing top 2' in out
+        assert out.index('C @ D') < out.index('E @ F')
+        assert 'A @ B' not in out
+    
+    def test_print_opportunities_one_bet_per_outcome(self, scanner, capsys):
+        """Test duplicate outcomes are reduced through best_per_game before display"""
+        def make_opp(bookmaker, ev):
+            return {
+                'game': 'A @ B', 'commence_time': '2025-01-01 15:00 UTC', 'market': 'h2h',
+                'outcome': 'Home', 'bookmaker': bookmaker, 'odds': 2.0, 'sharp_avg_odds': 1.9,
+                'ev_percentage': ev, 'true_probability': 52.0, 'bookmaker_probability': 50.0,
+                'kelly_stake': {'recommended_stake': 10.0, 'kelly_percentage': 1.0},
+                'expected_profit': ev, 'bookmaker_url': 'https://example.com', 'sharp_links': []
+            }
+        scanner.one_bet_per_outcome = True
+        scanner.one_bet_per_game = True
+        scanner.order_by = 'ev'
+        
+        with patch.object(scanner, 'best_per_game', wraps=scanner.best_per_game) as mock_best:
+            scanner.print_opportunities({'soccer_epl': [make_opp('Bet365', 3.0), make_opp('Betfair', 5.0)]})
+        
+        out = capsys.readouterr().out
+        mock_best.assert_called_once()
+        assert '1 opportunities (filtered from 2)' in out
+        assert 'Betfair' in out and 'Bet365' not in out
+    
+    def test_print_opportunities_empty(self, scanner, capsys):
+        """Test output when there are no opportunities"""
+        scanner.print_opportunities({})
+        
+        out = capsys.readouterr().out
+        assert 'POSITIVE EV OPPORTUNITIES FOUND: 0' in out
+        assert 'No +EV opportunities found at this time.' in out
+    
+    def test_print_opportunities_single_write_by_default(self, scanner, sample_betting_opportunity, capsys):
+        """Test all output goes out in one stdout write by default"""
+        opp = dict(sample_betting_opportunity, sharp_links=[])
+        with patch.object(scanner, '_flush_output', wraps=scanner._flush_output) as mock_flush:
+            scanner.print_opportunities({'soccer_epl': [opp]})
+        
+        assert mock_flush.call_count == 1
+        assert 'SOCCER EPL: 1 opportunities' in capsys.readouterr().out
+    
+    def test_print_opportunities_flushes_in_batches(self, scanner, capsys):
+        """Test small buffers produce the same output as one write"""
+        scanner._print_buffer_size = 1
+        with patch.object(scanner, '_flush_output', wraps=scanner._flush_output) as mock_flush:
+            scanner.print_opportunities({})
+        
+        out = capsys.readouterr().out
+        assert 'No +EV opportunities found at this time.' in out
+        assert mock_flush.call_count > 1
+        assert scanner._out_buffer == []
+
+
+class TestScanAllSports:
+    """Test concurrent scanning across sports"""
+    
+    def test_events_checked_once_per_sport(self, scanner):
+        """Test the events endpoint is not requested again for active sports"""
+        with patch.object(scanner, 'get_events', return_value=[{'id': 'e1'}]) as mock_events, \
+             patch.object(scanner, 'get_odds', return_value=[]) as mock_odds:
+            scanner.scan_all_sports(sport_keys=['soccer_epl', 'soccer_spain_la_liga'])
+        
+        assert mock_events.call_count == 2
+        assert mock_odds.call_count == 2
+    
+    def test_bet_history_read_once_per_scan(self, scanner):
+        """Test bet history is loaded once and shared by every sport"""
+        past_game = [{'id': 'g1', 'commence_time': '2020-01-01T00:00:00Z',
+                      'home_team': 'A', 'away_team': 'B', 'bookmakers': []}]
+        with patch.object(scanner, 'get_events', return_value=[{'id': 'e1'}]), \
+             patch.object(scanner, 'get_odds', return_value=past_game), \
+             patch.object(scanner.bet_repository, 'get_already_bet_outcomes', return_value=set()) as mock_history:
+            scanner.scan_all_sports(sport_keys=['soccer_epl', 'soccer_spain_la_liga'])
+        
+        assert mock_history.call_count == 1
+        assert scanner._bet_history_filters is None
+    
+    def test_sports_without_events_are_skipped(self, scanner):
+        """Test odds are only fetched for sports with active events"""
+        with patch.object(scanner, 'get_events', return_value=[]), \
+             patch.object(scanner, 'get_odds') as mock_odds:
+            result = scanner.scan_all_sports(sport_keys=['soccer_epl'])
+        
+        assert result == {}
+        mock_odds.assert_not_called()
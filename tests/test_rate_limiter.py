@@ -0,0 +1,184 @@
+"""
+Unit tests for the RateLimiter module
+"""
+
+import pytest
+from unittest.mock import patch
+from src.utils.rate_limiter import RateLimiter, AdaptiveConcurrencyLimiter
+
+
+class FakeClock:
+    """Deterministic replacement for time.monotonic/time.sleep"""
+    
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+    
+    def monotonic(self):
+        return self.now
+    
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    """Patch the limiter's time functions with a fake clock"""
+    fake = FakeClock()
+    with patch('src.utils.rate_limiter.time.monotonic', fake.monotonic), \
+         patch('src.utils.rate_limiter.time.sleep', fake.sleep):
+        yield fake
+
+
+class TestMinInterval:
+    """Test minimum spacing between requests"""
+    
+    def test_first_request_not_delayed(self, clock):
+        """Test the first request goes straight through"""
+        limiter = RateLimiter(min_interval=0.5)
+        limiter.acquire()
+        assert clock.sleeps == []
+    
+    def test_back_to_back_requests_spaced(self, clock):
+        """Test consecutive requests wait for the remaining interval"""
+        limiter = RateLimiter(min_interval=0.5)
+        limiter.acquire()
+        clock.now += 0.2
+        limiter.acquire()
+        assert clock.sleeps == [pytest.approx(0.3)]
+
+
+class TestSlidingWindow:
+    """Test the requests-per-minute cap"""
+    
+    def test_blocks_when_window_full(self, clock):
+        """Test waiting until the oldest request leaves the window"""
+        limiter = RateLimiter(max_per_minute=3)
+        for _ in range(3):
+            limiter.acquire()
+            clock.now += 1
+        
+        limiter.acquire()
+        
+        # Oldest request was 3s ago, so wait the remaining 57s
+        assert clock.sleeps == [pytest.approx(57.0)]
+    
+    def test_window_expires_old_requests(self, clock):
+        """Test requests older than the window no longer count"""
+        limiter = RateLimiter(max_per_minute=2)
+        limiter.acquire()
+        limiter.acquire()
+        clock.now += 61
+        
+        limiter.acquire()
+        
+        assert clock.sleeps == []
+    
+    def test_disabled_by_default(self, clock):
+        """Test no cap is applied when max_per_minute is 0"""
+        limiter = RateLimiter()
+        for _ in range(100):
+            limiter.acquire()
+        assert clock.sleeps == []
+
+
+class TestReservations:
+    """Test concurrent callers reserving successive slots"""
+    
+    @pytest.fixture
+    def frozen(self, clock):
+        """Clock that does not advance while sleeping, as if every caller arrived at once"""
+        clock.sleep = clock.sleeps.append
+        with patch('src.utils.rate_limiter.time.sleep', clock.sleep):
+            yield clock
+    
+    def test_min_interval_slots_queue_up(self, frozen):
+        """Test simultaneous callers are spaced by min_interval each"""
+        limiter = RateLimiter(min_interval=0.5)
+        for _ in range(3):
+            limiter.acquire()
+        assert frozen.sleeps == [pytest.approx(0.5), pytest.approx(1.0)]
+    
+    def test_window_slots_queue_up(self, frozen):
+        """Test reserved slots count towards the sliding window"""
+        limiter = RateLimiter(max_per_minute=2)
+        for _ in range(5):
+            limiter.acquire()
+        assert frozen.sleeps == [pytest.approx(60.0), pytest.approx(60.0), pytest.approx(120.0)]
+    
+    def test_sleeps_without_holding_lock(self, clock):
+        """Test the wait happens outside the limiter's lock"""
+        limiter = RateLimiter(min_interval=0.5)
+        held = []
+        
+        def sleep(seconds):
+            held.append(limiter._lock.locked())
+            clock.now += seconds
+        
+        with patch('src.utils.rate_limiter.time.sleep', sleep):
+            limiter.acquire()
+            limiter.acquire()
+        
+        assert held == [False]
+
+
+class TestAdaptiveConcurrencyLimiter:
+    """Test AIMD concurrency adjustment"""
+    
+    def test_increases_when_latency_within_target(self):
+        """Test additive increase after a healthy window"""
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=4, max_limit=8,
+                                             target_latency=1.0, window=5)
+        for _ in range(5):
+            limiter.record(0.5)
+        assert limiter.limit == 5
+    
+    def test_no_change_before_window_full(self):
+        """Test the limit only moves once per window"""
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=4, max_limit=8, window=5)
+        for _ in range(4):
+            limiter.record(0.1)
+        assert limiter.limit == 4
+    
+    def test_halves_when_latency_too_high(self):
+        """Test multiplicative decrease on slow responses"""
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=8, target_latency=1.0, window=2)
+        limiter.record(3.0)
+        limiter.record(3.0)
+        assert limiter.limit == 4
+    
+    def test_halves_on_failure(self):
+        """Test a throttled request shrinks the limit immediately"""
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=10)
+        limiter.record(0.1, success=False)
+        assert limiter.limit == 5
+    
+    def test_concurrent_failures_decrease_once(self, clock):
+        """Test a burst of failures from the same round halves the limit once"""
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=8)
+        for _ in range(4):
+            limiter.record(0.5, success=False)
+        assert limiter.limit == 4
+        
+        # A request started after the cut can shrink it again
+        clock.now += 1.0
+        limiter.record(0.5, success=False)
+        assert limiter.limit == 2
+    
+    def test_respects_bounds(self):
+        """Test the limit stays within [min_limit, max_limit]"""
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=2, min_limit=1, max_limit=3, window=1)
+        for _ in range(5):
+            limiter.record(0.1, success=False)
+        assert limiter.limit == 1
+        for _ in range(5):
+            limiter.record(0.1)
+        assert limiter.limit == 3
+    
+    def test_context_manager_tracks_in_flight(self):
+        """Test slots are taken and returned"""
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=2)
+        with limiter:
+            assert limiter._in_flight == 1
+        assert limiter._in_flight == 0